@@ -2,7 +2,6 @@
 #!/usr/bin/env python3
 """A github org client
 """
-import requests
 from typing import (
     List,
     Dict,
@@ -10,6 +9,7 @@ from typing import (
 
 from utils import (
     access_nested_map,
+    get_json,
     memoize,
 )
 
@@ -18,6 +18,12 @@ class GithubOrgClient:
     """A Githib org client
     """
     ORG_URL = "https://api.github.com/orgs/{org}"
+    __slots__ = (
+        "_org_name",
+        "_memoized_org",
+        "_memoized__public_repos_url",
+        "_memoized_repos_payload",
+    )
 
     def __init__(self, org_name: str) -> None:
         """Init method of GithubOrgClient"""
@@ -26,10 +32,9 @@ class GithubOrgClient:
     @memoize
     def org(self) -> Dict:
         """Memoize org"""
-        response = requests.get(self.ORG_URL.format(org=self._org_name))
-        return response.json()
+        return get_json(self.ORG_URL.format(org=self._org_name))
 
-    @property
+    @memoize
     def _public_repos_url(self) -> str:
         """Public repos URL"""
         return self.org["repos_url"]
@@ -37,19 +42,19 @@ class GithubOrgClient:
     @memoize
     def repos_payload(self) -> Dict:
         """Memoize repos payload"""
-        response = requests.get(self._public_repos_url)
-        return response.json()
+        return get_json(self._public_repos_url)
 
     def public_repos(self, license: str = None) -> List[str]:
         """Public repos"""
         json_payload = self.repos_payload
-        public_repos = [
+        if license is None:
+            return [repo["name"] for repo in json_payload]
+        return [
             repo["name"] for repo in json_payload
-            if license is None or self.has_license(repo, license)
+            if (repo_license := repo.get("license"))
+            and repo_license.get("key") == license
         ]
 
-        return public_repos
-
     @staticmethod
     def has_license(repo: Dict[str, Dict], license_key: str) -> bool:
         """Static: has_license"""
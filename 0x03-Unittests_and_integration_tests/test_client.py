@@ -2,14 +2,32 @@
 """
 Test file for client.py
 """
+import re
 import unittest
-from unittest.mock import patch, Mock, PropertyMock
+from unittest.mock import patch, PropertyMock, create_autospec
+import requests_mock
 from parameterized import parameterized, parameterized_class
 from client import GithubOrgClient
+from utils import get_json
 from fixtures import TEST_PAYLOAD
 
-# Extract the test data from TEST_PAYLOAD
-org_payload, repos_payload, expected_repos, apache2_repos = TEST_PAYLOAD[0]
+# Build the mocks once at import time; each test resets them before use
+# instead of paying for autospec inspection on every patch entry.
+_GET_JSON_MOCK = create_autospec(get_json)
+_ORG_PROP = PropertyMock()
+_PUBLIC_REPOS_URL_PROP = PropertyMock()
+
+# URL matchers for the integration tests, compiled once at import time
+_ORG_URL_RE = re.compile(r"/orgs/[^/]+$")
+_REPOS_URL_RE = re.compile(r"/repos$")
+
+
+def _fresh(mock):
+    """
+    Reset a shared module-level mock and return it.
+    """
+    mock.reset_mock()
+    return mock
 
 
 class TestGithubOrgClient(unittest.TestCase):
@@ -20,46 +38,44 @@ class TestGithubOrgClient(unittest.TestCase):
         ('google',),
         ('abc',),
     ])
-    @patch('client.requests.get')
-    def test_org(self, org_name, mock_get):
+    @patch('client.get_json', new=_GET_JSON_MOCK)
+    def test_org(self, org_name):
         """
         Test that GithubOrgClient.org returns the correct value.
         """
-        mock_response = Mock()
-        mock_response.json.return_value = {"payload": True}
-        mock_get.return_value = mock_response
+        mock_get_json = _fresh(_GET_JSON_MOCK)
+        mock_get_json.return_value = {"payload": True}
         client = GithubOrgClient(org_name)
         result = client.org
         self.assertEqual(result, {"payload": True})
-        mock_get.assert_called_once_with(
+        mock_get_json.assert_called_once_with(
             f"https://api.github.com/orgs/{org_name}")
 
     def test_public_repos_url(self):
         """
         Test that _public_repos_url returns the correct URL.
         """
-        with patch('client.GithubOrgClient.org',
-                   new_callable=PropertyMock) as mock_org:
+        mock_org = _fresh(_ORG_PROP)
+        with patch('client.GithubOrgClient.org', new=mock_org):
             mock_org.return_value = {"repos_url": "http://mocked_url.com"}
             client = GithubOrgClient("test_org")
             self.assertEqual(client._public_repos_url,
                              "http://mocked_url.com")
 
-    @patch('client.requests.get')
-    def test_public_repos(self, mock_get):
+    @patch('client.get_json', new=_GET_JSON_MOCK)
+    def test_public_repos(self):
         """
         Test that public_repos returns the correct list of repositories.
         """
-        repos_payload = [
+        mock_get_json = _fresh(_GET_JSON_MOCK)
+        mock_get_json.return_value = [
             {"name": "repo1", "license": {"key": "mit"}},
             {"name": "repo2", "license": {"key": "apache-2.0"}}
         ]
-        mock_response = Mock()
-        mock_response.json.return_value = repos_payload
-        mock_get.return_value = mock_response
 
+        mock_public_repos_url = _fresh(_PUBLIC_REPOS_URL_PROP)
         with patch('client.GithubOrgClient._public_repos_url',
-                   new_callable=PropertyMock) as mock_public_repos_url:
+                   new=mock_public_repos_url):
             mock_public_repos_url.return_value = (
                 "https://api.github.com/orgs/test/repos")
             client = GithubOrgClient("test_org")
@@ -67,30 +83,28 @@ class TestGithubOrgClient(unittest.TestCase):
 
             self.assertEqual(result, ["repo1", "repo2"])
             mock_public_repos_url.assert_called_once()
-            mock_get.assert_called_once_with(
+            mock_get_json.assert_called_once_with(
                 "https://api.github.com/orgs/test/repos")
 
-    @parameterized.expand([
-        ({"license": {"key": "my_license"}}, "my_license", True),
-        ({"license": {"key": "other_license"}}, "my_license", False),
-    ])
-    def test_has_license(self, repo, license_key, expected_result):
+    def test_has_license(self):
         """
         Test that has_license returns the correct result for given repo and
         license key.
         """
-        self.assertEqual(GithubOrgClient.has_license(repo, license_key),
-                         expected_result)
+        for repo, license_key, expected_result in [
+            ({"license": {"key": "my_license"}}, "my_license", True),
+            ({"license": {"key": "other_license"}}, "my_license", False),
+        ]:
+            with self.subTest(repo=repo, license_key=license_key):
+                self.assertEqual(
+                    GithubOrgClient.has_license(repo, license_key),
+                    expected_result)
 
 
-@parameterized_class([
-    {
-        "org_payload": org_payload,
-        "repos_payload": repos_payload,
-        "expected_repos": expected_repos,
-        "apache2_repos": apache2_repos,
-    }
-])
+@parameterized_class(
+    ("org_payload", "repos_payload", "expected_repos", "apache2_repos"),
+    TEST_PAYLOAD,
+)
 class TestIntegrationGithubOrgClient(unittest.TestCase):
     """
     Integration test for the GithubOrgClient.
@@ -101,31 +115,17 @@ class TestIntegrationGithubOrgClient(unittest.TestCase):
         """
         Set up the class-level fixtures for the integration test.
         """
-        def get_side_effect(url):
-            response = type('Response', (), {})()
-            if "orgs" in url and "repos" not in url:
-                response.json = lambda: cls.org_payload
-            elif "repos" in url:
-                response.json = lambda: cls.repos_payload
-            else:
-                response.json = lambda: {}
-            return response
-
-        cls.get_patcher = patch('requests.get', side_effect=get_side_effect)
-        cls.get_patcher.start()
+        cls.m = requests_mock.Mocker()
+        cls.m.start()
+        cls.m.get(_ORG_URL_RE, json=cls.org_payload)
+        cls.m.get(_REPOS_URL_RE, json=cls.repos_payload)
 
     @classmethod
     def tearDownClass(cls):
         """
         Tear down the class-level fixtures.
         """
-        cls.get_patcher.stop()
-
-    def setUp(self):
-        """
-        Set up instance-level fixtures.
-        """
-        self.get_patcher = self.__class__.get_patcher
+        cls.m.stop()
 
     def test_public_repos(self):
         """
@@ -2,6 +2,7 @@
 """
 Test file for utils.py
 """
+import json
 import unittest
 from parameterized import parameterized
 from unittest.mock import patch, Mock
@@ -12,28 +13,31 @@ class TestAccessNestedMap(unittest.TestCase):
     """
     TestAccessNestedMap class to test the access_nested_map function.
     """
-    @parameterized.expand([
-        ({"a": 1}, ("a",), 1),
-        ({"a": {"b": 2}}, ("a",), {"b": 2}),
-        ({"a": {"b": 2}}, ("a", "b"), 2),
-    ])
-    def test_access_nested_map(self, nested_map, path, expected_result):
+    def test_access_nested_map(self):
         """
         Test that access_nested_map returns the correct value.
         """
-        self.assertEqual(access_nested_map(nested_map, path), expected_result)
+        for nested_map, path, expected_result in [
+            ({"a": 1}, ("a",), 1),
+            ({"a": {"b": 2}}, ("a",), {"b": 2}),
+            ({"a": {"b": 2}}, ("a", "b"), 2),
+        ]:
+            with self.subTest(nested_map=nested_map, path=path):
+                self.assertEqual(access_nested_map(nested_map, path),
+                                 expected_result)
 
-    @parameterized.expand([
-        ({}, ("a",)),
-        ({"a": 1}, ("a", "b")),
-    ])
-    def test_access_nested_map_exception(self, nested_map, path):
+    def test_access_nested_map_exception(self):
         """
         Test that access_nested_map raises a KeyError for an invalid path.
         """
-        with self.assertRaises(KeyError) as cm:
-            access_nested_map(nested_map, path)
-        self.assertEqual(str(cm.exception), repr(path[-1]))
+        for nested_map, path in [
+            ({}, ("a",)),
+            ({"a": 1}, ("a", "b")),
+        ]:
+            with self.subTest(nested_map=nested_map, path=path):
+                with self.assertRaises(KeyError) as cm:
+                    access_nested_map(nested_map, path)
+                self.assertEqual(str(cm.exception), repr(path[-1]))
 
 
 class TestGetJson(unittest.TestCase):
@@ -44,12 +48,13 @@ class TestGetJson(unittest.TestCase):
         ("http://example.com", {"payload": True}),
         ("http://holberton.io", {"payload": False}),
     ])
-    @patch('requests.get')
+    @patch('utils._session.get')
     def test_get_json(self, test_url, test_payload, mock_get):
         """
         Test that get_json returns the correct payload.
         """
         mock_response = Mock()
+        mock_response.content = json.dumps(test_payload).encode()
         mock_response.json.return_value = test_payload
         mock_get.return_value = mock_response
         self.assertEqual(get_json(test_url), test_payload)
@@ -77,4 +82,25 @@ class TestMemoize(unittest.TestCase):
             test_obj = TestClass()
             self.assertEqual(test_obj.a_property, 42)
             self.assertEqual(test_obj.a_property, 42)
-            mock_method.assert_called_once()
\ No newline at end of file
+            mock_method.assert_called_once()
+
+    def test_memoize_slots(self):
+        """
+        Test that memoize caches into a slot on classes without __dict__.
+        """
+        class TestClass:
+            __slots__ = ("_memoized_a_property",)
+
+            def a_method(self):
+                return 42
+
+            @memoize
+            def a_property(self):
+                return self.a_method()
+
+        with patch.object(TestClass, 'a_method',
+                          return_value=42) as mock_method:
+            test_obj = TestClass()
+            self.assertEqual(test_obj.a_property, 42)
+            self.assertEqual(test_obj.a_property, 42)
+            mock_method.assert_called_once()
@@ -2,7 +2,7 @@
 """Generic utilities for github org client.
 """
 import requests
-from functools import wraps
+from functools import update_wrapper
 from typing import (
     Mapping,
     Sequence,
@@ -11,12 +11,20 @@ from typing import (
     Callable,
 )
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 __all__ = [
     "access_nested_map",
     "get_json",
     "memoize",
 ]
 
+# Shared session so repeated calls reuse the pooled keep-alive connection
+_session = requests.Session()
+
 
 def access_nested_map(nested_map: Mapping, path: Sequence) -> Any:
     """Access nested map with key path.
@@ -33,7 +41,9 @@ def access_nested_map(nested_map: Mapping, path: Sequence) -> Any:
     1
     """
     for key in path:
-        if not isinstance(nested_map, Mapping):
+        # Exact dicts skip the comparatively slow ABC isinstance check
+        if (type(nested_map) is not dict
+                and not isinstance(nested_map, Mapping)):
             raise KeyError(key)
         nested_map = nested_map[key]
 
@@ -43,12 +53,18 @@ def access_nested_map(nested_map: Mapping, path: Sequence) -> Any:
 def get_json(url: str) -> Dict:
     """Get JSON from remote URL.
     """
-    response = requests.get(url)
+    response = _session.get(url)
+    if orjson is not None:
+        return orjson.loads(response.content)
     return response.json()
 
 
-def memoize(fn: Callable) -> Callable:
+class memoize:
     """Decorator to memoize a method.
+    The first access stores the result in the instance ``__dict__`` under
+    the method name, which shadows this non-data descriptor so later
+    accesses are plain attribute reads. Classes without an instance
+    ``__dict__`` must declare a ``_memoized_<name>`` slot instead.
     Example
     -------
     class MyClass:
@@ -63,13 +79,31 @@ def memoize(fn: Callable) -> Callable:
     >>> my_object.a_method
     42
     """
-    attr_name = "_{}".format(fn.__name__)
 
-    @wraps(fn)
-    def memoized(self):
-        """"memoized wraps"""
-        if not hasattr(self, attr_name):
-            setattr(self, attr_name, fn(self))
-        return getattr(self, attr_name)
+    def __init__(self, fn: Callable) -> None:
+        """Wrap the method to memoize"""
+        self.fn = fn
+        self.name = fn.__name__
+        self.slot = None
+        update_wrapper(self, fn)
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        """Record the attribute name the descriptor is bound to"""
+        self.name = name
+        if not owner.__dictoffset__:
+            self.slot = "_memoized_{}".format(name)
 
-    return property(memoized)
\ No newline at end of file
+    def __get__(self, obj: Any, cls: type = None) -> Any:
+        """Compute the value once and cache it on the instance"""
+        if obj is None:
+            return self
+        if self.slot is None:
+            value = self.fn(obj)
+            obj.__dict__[self.name] = value
+            return value
+        try:
+            return getattr(obj, self.slot)
+        except AttributeError:
+            value = self.fn(obj)
+            setattr(obj, self.slot, value)
+            return value
@@ -0,0 +1,24 @@
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+
+class QueuedFileHandler(QueueHandler):
+    """
+    Logging handler that hands records to a background thread which writes
+    them to a file, keeping disk I/O off the request thread.
+    """
+    
+    def __init__(self, filename, mode='a', encoding=None):
+        super().__init__(queue.SimpleQueue())
+        self.listener = QueueListener(self.queue, logging.FileHandler(filename, mode, encoding))
+        self.listener.start()
+    
+    def close(self):
+        # Flush pending records and release the file; close() may run twice at shutdown
+        if self.listener is not None:
+            self.listener.stop()
+            for handler in self.listener.handlers:
+                handler.close()
+            self.listener = None
+        super().close()
@@ -1,24 +1,45 @@
 import logging
-from datetime import datetime, time
+import time
+from datetime import datetime
 from django.http import HttpResponseForbidden, JsonResponse
 from django.utils.deprecation import MiddlewareMixin
-from collections import defaultdict
+from collections import defaultdict, deque
 import threading
 
-# Configure logging for requests
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(message)s',
-    handlers=[
-        logging.FileHandler('requests.log'),
-        logging.StreamHandler()
-    ]
-)
+# Handlers for request logging are configured in settings.LOGGING
 logger = logging.getLogger(__name__)
 
-# Thread-safe storage for rate limiting
-rate_limit_storage = defaultdict(list)
+# Restricted hours for chat access: 21:00 (9PM) to 06:00 (6AM)
+RESTRICTED_START_HOUR = 21
+RESTRICTED_END_HOUR = 6
+
+# Roles allowed through RolepermissionMiddleware besides staff/superusers
+ALLOWED_ROLES = frozenset(('admin', 'moderator'))
+
+# Rate limiting: at most RATE_LIMIT_MAX_REQUESTS POSTs per IP per window
+RATE_LIMIT_MAX_REQUESTS = 5
+RATE_LIMIT_WINDOW_SECONDS = 60
+# Drop idle IPs from the storage every N rate-limited requests
+RATE_LIMIT_SWEEP_INTERVAL = 1000
+
+# Thread-safe storage for rate limiting: one bounded deque of timestamps per IP
+rate_limit_storage = defaultdict(lambda: deque(maxlen=RATE_LIMIT_MAX_REQUESTS))
 rate_limit_lock = threading.Lock()
+_requests_since_sweep = 0
+
+
+def _sweep_idle_clients(current_time):
+    """Remove IPs whose newest timestamp has left the rate limit window.
+
+    Must be called with rate_limit_lock held.
+    """
+    idle = [
+        ip for ip, timestamps in rate_limit_storage.items()
+        if not timestamps
+        or current_time - timestamps[-1] >= RATE_LIMIT_WINDOW_SECONDS
+    ]
+    for ip in idle:
+        del rate_limit_storage[ip]
 
 
 class RequestLoggingMiddleware(MiddlewareMixin):
@@ -31,10 +52,10 @@ class RequestLoggingMiddleware(MiddlewareMixin):
         super().__init__(get_response)
     
     def __call__(self, request):
-        # Log the request information
-        user = request.user if hasattr(request, 'user') and request.user.is_authenticated else 'Anonymous'
-        log_message = f"{datetime.now()} - User: {user} - Path: {request.path}"
-        logger.info(log_message)
+        # Log the request information; skip the work entirely when INFO is disabled
+        if logger.isEnabledFor(logging.INFO):
+            user = request.user if hasattr(request, 'user') and request.user.is_authenticated else 'Anonymous'
+            logger.info("User: %s - Path: %s", user, request.path)
         
         response = self.get_response(request)
         return response
@@ -51,14 +72,10 @@ class RestrictAccessByTimeMiddleware(MiddlewareMixin):
         super().__init__(get_response)
     
     def __call__(self, request):
-        current_time = datetime.now().time()
-        
-        # Define restricted hours: 21:00 (9PM) to 06:00 (6AM)
-        start_restriction = time(21, 0)  # 9PM
-        end_restriction = time(6, 0)     # 6AM
+        current_hour = datetime.now().hour
         
         # Check if current time is within restricted hours
-        if current_time >= start_restriction or current_time <= end_restriction:
+        if current_hour >= RESTRICTED_START_HOUR or current_hour < RESTRICTED_END_HOUR:
             return HttpResponseForbidden("Access denied: Chat is only available between 6AM and 9PM")
         
         response = self.get_response(request)
@@ -76,26 +93,34 @@ class OffensiveLanguageMiddleware(MiddlewareMixin):
         super().__init__(get_response)
     
     def __call__(self, request):
+        global _requests_since_sweep
+        
         # Only apply rate limiting to POST requests (chat messages)
         if request.method == 'POST':
             client_ip = self.get_client_ip(request)
-            current_time = datetime.now()
+            # Monotonic float seconds: no datetime/timedelta allocations per check
+            current_time = time.monotonic()
             
             with rate_limit_lock:
-                # Clean old entries (older than 1 minute)
-                rate_limit_storage[client_ip] = [
-                    timestamp for timestamp in rate_limit_storage[client_ip]
-                    if (current_time - timestamp).total_seconds() < 60
-                ]
+                _requests_since_sweep += 1
+                if _requests_since_sweep >= RATE_LIMIT_SWEEP_INTERVAL:
+                    _requests_since_sweep = 0
+                    _sweep_idle_clients(current_time)
+                
+                # Drop entries that left the window (older than 1 minute);
+                # timestamps are appended in order so only the head can be stale
+                timestamps = rate_limit_storage[client_ip]
+                while timestamps and current_time - timestamps[0] >= RATE_LIMIT_WINDOW_SECONDS:
+                    timestamps.popleft()
                 
                 # Check if user has exceeded the limit (5 messages per minute)
-                if len(rate_limit_storage[client_ip]) >= 5:
+                if len(timestamps) >= RATE_LIMIT_MAX_REQUESTS:
                     return JsonResponse({
                         'error': 'Rate limit exceeded. Maximum 5 messages per minute allowed.'
                     }, status=429)
                 
                 # Add current request timestamp
-                rate_limit_storage[client_ip].append(current_time)
+                timestamps.append(current_time)
         
         response = self.get_response(request)
         return response
@@ -104,7 +129,8 @@ class OffensiveLanguageMiddleware(MiddlewareMixin):
         """Get the client's IP address from the request."""
         x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
         if x_forwarded_for:
-            ip = x_forwarded_for.split(',')[0]
+            # Only the first (client) address is needed; avoid building the full proxy list
+            ip = x_forwarded_for.partition(',')[0].strip()
         else:
             ip = request.META.get('REMOTE_ADDR')
         return ip
@@ -124,8 +150,8 @@ class RolepermissionMiddleware(MiddlewareMixin):
         if hasattr(request, 'user') and request.user.is_authenticated:
             # Check if user has admin or moderator role
             # Assuming the User model has a role field or is_staff/is_superuser
-            if not (request.user.is_staff or request.user.is_superuser or 
-                   (hasattr(request.user, 'role') and request.user.role in ['admin', 'moderator'])):
+            if not (request.user.is_staff or request.user.is_superuser or
+                    getattr(request.user, 'role', None) in ALLOWED_ROLES):
                 return HttpResponseForbidden("Access denied: Admin or moderator role required")
         
         response = self.get_response(request)
@@ -53,15 +53,33 @@ class User(AbstractBaseUser, PermissionsMixin):
         return self.email
 
     def save(self, *args, **kwargs):
+        adding = self._state.adding
         if self.password:
             self.password_hash = self.password
         super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        # Conversations render their participants, so a profile change must
+        # change their ETags; last_login-only saves on login are skipped
+        if not adding and (update_fields is None or set(update_fields) - {'last_login'}):
+            self.touch_conversations()
+
+    def delete(self, *args, **kwargs):
+        # The memberships cascade without m2m_changed, so bump first
+        self.touch_conversations()
+        return super().delete(*args, **kwargs)
+
+    def touch_conversations(self):
+        Conversation.objects.filter(participants=self).update(updated_at=timezone.now())
 
 
 class Conversation(models.Model):
     conversation_id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     participants = models.ManyToManyField(settings.AUTH_USER_MODEL, related_name='conversations')
     created_at = models.DateTimeField(auto_now_add=True)
+    # Bumped when the conversation, one of its messages, its participant set
+    # or a participant's profile changes; part of the ETag for conditional
+    # GETs of the conversation detail
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"Conversation {self.conversation_id}"
@@ -75,5 +93,27 @@ class Message(models.Model):
     sent_at = models.DateTimeField(default=timezone.now)
     is_read = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['sender', 'sent_at']),  # Serves sender + sent_at range filters
+            models.Index(fields=['conversation', '-sent_at']),  # Serves cursor pages of a conversation
+        ]
+
     def __str__(self):
         return f"Message {self.message_id} from {self.sender.email} at {self.sent_at}"
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # Edits leave the message count and newest sent_at alone, so they have
+        # to change updated_at to change the conversation ETag
+        self.touch_conversation()
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        self.touch_conversation()
+        return result
+
+    def touch_conversation(self):
+        # Single-row UPDATE; no need to load the conversation. Queryset
+        # update()s that edit messages must bump updated_at the same way
+        Conversation.objects.filter(pk=self.conversation_id).update(updated_at=timezone.now())
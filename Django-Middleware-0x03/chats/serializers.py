@@ -1,3 +1,4 @@
+from django.db import transaction
 from rest_framework import serializers
 from .models import User, Conversation, Message
 
@@ -33,14 +34,59 @@ class MessageSerializer(serializers.ModelSerializer):
 
 class ConversationSerializer(serializers.ModelSerializer):
     participants = UserSerializer(many=True, read_only=True)
+    participants_count = serializers.IntegerField(read_only=True)
     messages = MessageSerializer(many=True, read_only=True)
+    participant_ids = serializers.ListField(
+        child=serializers.UUIDField(), write_only=True, required=False
+    )
 
     def validate(self, data):
         # Example validation: don't allow empty conversations (this is just illustrative)
-        if not data.get("participants") and self.instance is None:
+        if not data.get("participant_ids") and self.instance is None:
             raise serializers.ValidationError("A conversation must include at least one participant.")
+        # ModelSerializer.update() would setattr the list and drop it, so say so
+        if "participant_ids" in data and self.instance is not None:
+            raise serializers.ValidationError(
+                {"participant_ids": "Participants can only be set when the conversation is created."}
+            )
         return data
 
+    def validate_participant_ids(self, value):
+        participant_ids = set(value)
+        # One SELECT for all participants instead of one per ID
+        users = list(User.objects.filter(user_id__in=participant_ids))
+        missing = participant_ids - {user.user_id for user in users}
+        if missing:
+            raise serializers.ValidationError(
+                [f"User {user_id} does not exist." for user_id in sorted(map(str, missing))]
+            )
+        return users
+
+    def create(self, validated_data):
+        users = validated_data.pop('participant_ids', [])
+        request = self.context.get('request')
+        # The creator joins in the same INSERT as the other participants
+        if request is not None and request.user.is_authenticated and request.user not in users:
+            users.append(request.user)
+        with transaction.atomic():
+            conversation = Conversation.objects.create(**validated_data)
+            # The conversation is new, so skip add()'s lookup of existing rows and
+            # write every membership in one multi-row INSERT into the through table
+            Membership = Conversation.participants.through
+            Membership.objects.bulk_create([
+                Membership(conversation=conversation, user=user) for user in users
+            ])
+        return conversation
+
+    class Meta:
+        model = Conversation
+        fields = ['conversation_id', 'participants', 'participants_count', 'participant_ids', 'created_at', 'messages']
+
+
+class ConversationListSerializer(serializers.ModelSerializer):
+    participants = UserSerializer(many=True, read_only=True)
+    participants_count = serializers.IntegerField(read_only=True)
+
     class Meta:
         model = Conversation
-        fields = ['conversation_id', 'participants', 'created_at', 'messages']
+        fields = ['conversation_id', 'participants', 'participants_count', 'created_at']
@@ -62,6 +62,10 @@ REST_FRAMEWORK = {
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'chats.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
 }
 
 
@@ -166,3 +170,34 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Logging
+# https://docs.djangoproject.com/en/5.2/topics/logging/
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'request': {
+            'format': '%(asctime)s - %(message)s',
+        },
+    },
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'request',
+        },
+        'requests_file': {
+            'class': 'chats.log_handlers.QueuedFileHandler',
+            'filename': BASE_DIR / 'requests.log',
+            'formatter': 'request',
+        },
+    },
+    'loggers': {
+        'chats.middleware': {
+            'handlers': ['console', 'requests_file'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
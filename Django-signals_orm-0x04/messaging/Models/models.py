@@ -2,11 +2,19 @@
 # This file demonstrates custom managers and advanced ORM techniques
 
 import uuid
-from django.db import models
+from collections import Counter
+from datetime import timedelta
+from django.db import IntegrityError, models, transaction
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin, BaseUserManager
+from django.db.models import Count, F, Value
+from django.db.models.functions import Greatest
 from django.utils import timezone
 
 
+# Maximum number of IDs per UPDATE ... WHERE message_id IN (...) statement
+MARK_AS_READ_BATCH_SIZE = 1000
+
+
 class CustomUserManager(BaseUserManager):
     def create_user(self, email, password=None, **extra_fields):
         if not email:
@@ -22,6 +30,12 @@ class CustomUserManager(BaseUserManager):
         extra_fields.setdefault('is_superuser', True)
         return self.create_user(email, password, **extra_fields)
 
+    def adjust_unread_count(self, user_id, delta):
+        """Atomically add delta to a user's denormalized unread_count (never below 0)."""
+        return self.filter(pk=user_id).update(
+            unread_count=Greatest(F('unread_count') + delta, Value(0))
+        )
+
 
 class User(AbstractBaseUser, PermissionsMixin):
     user_id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -31,6 +45,9 @@ class User(AbstractBaseUser, PermissionsMixin):
     is_active = models.BooleanField(default=True)
     is_staff = models.BooleanField(default=False)
     date_joined = models.DateTimeField(default=timezone.now)
+    # Denormalized count of unread received messages, kept in step by signals
+    # and mark_as_read_for_user so the unread badge needs no COUNT(*) query
+    unread_count = models.PositiveIntegerField(default=0)
 
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['first_name', 'last_name']
@@ -41,6 +58,22 @@ class User(AbstractBaseUser, PermissionsMixin):
         return self.email
 
 
+def release_unread_counts(unread, deleted_user_id=None):
+    """
+    Take deleted unread messages off UnreadRollup and User.unread_count, one
+    UPDATE per (receiver_id, sender_id) pair and per receiver. Counters owned
+    by deleted_user_id are skipped; they cascade away with the user.
+    """
+    by_receiver = Counter()
+    for (receiver_id, sender_id), count in unread.items():
+        if receiver_id != deleted_user_id:
+            by_receiver[receiver_id] += count
+        if deleted_user_id not in (receiver_id, sender_id):
+            UnreadRollup.objects.adjust(receiver_id, sender_id, -count)
+    for receiver_id, count in by_receiver.items():
+        User.objects.adjust_unread_count(receiver_id, -count)
+
+
 # Custom QuerySet for advanced message operations
 class MessageQuerySet(models.QuerySet):
     """
@@ -59,9 +92,13 @@ class MessageQuerySet(models.QuerySet):
         return self.filter(sender=user)
     
     def recent(self, days=7):
-        """Filter messages from the last N days."""
-        from datetime import timedelta
-        return self.filter(timestamp__gte=timezone.now() - timedelta(days=days))
+        """
+        Filter messages from the last N days.
+        The cutoff is computed once and compared against the bare timestamp
+        column, so the predicate stays a plain indexable timestamp >= %s.
+        """
+        cutoff = timezone.now() - timedelta(days=days)
+        return self.filter(timestamp__gte=cutoff)
     
     def with_sender_info(self):
         """Optimize query by selecting related sender information."""
@@ -80,8 +117,49 @@ class MessageQuerySet(models.QuerySet):
         return self.only('message_id', 'sender__email', 'content', 'timestamp', 'read')
     
     def unread_for_user_optimized(self, user):
-        """Combined optimization for unread messages for a user."""
-        return self.for_user(user).unread_only().with_sender_info().only_essential_fields()
+        """Combined optimization for unread messages for a user, newest first."""
+        return self.for_user(user).unread_only().with_sender_info().only_essential_fields().order_by(
+            '-timestamp'
+        )
+    
+    def unread_list_fast(self, user):
+        """
+        Unread messages for a user as dicts, newest first.
+        The sender email comes from the SQL join; no model instances are built.
+        """
+        return self.for_user(user).unread_only().values(
+            'message_id', 'content', 'timestamp', 'sender__email'
+        ).order_by('-timestamp')
+    
+    def unread_pair_counts(self):
+        """
+        Count unread messages per (receiver_id, sender_id) across these
+        messages and every reply below them: the rows deleting them removes.
+        """
+        counts = Counter()
+        seen = set()
+        level = set(self.values_list('pk', flat=True))
+        while level:
+            seen |= level
+            unread = Message.objects.filter(pk__in=level, read=False).values_list(
+                'receiver_id', 'sender_id'
+            ).annotate(count=Count('pk')).order_by()
+            counts.update({(receiver_id, sender_id): count for receiver_id, sender_id, count in unread})
+            replies = Message.objects.filter(parent_message_id__in=level).values_list('pk', flat=True)
+            level = set(replies) - seen
+        return counts
+    
+    def delete(self):
+        """
+        Delete the messages and release their unread counters in one grouped
+        pass rather than by a per-row post_delete receiver, which would cost
+        two UPDATEs per deleted row.
+        """
+        with transaction.atomic(using=self.db):
+            unread = self.unread_pair_counts()
+            deleted = super().delete()
+            release_unread_counts(unread)
+        return deleted
 
 
 # Custom Manager for Unread Messages
@@ -111,8 +189,10 @@ class UnreadMessagesManager(models.Manager):
         return self.get_queryset().for_user(user).unread_only().count()
     
     def recent_unread_for_user(self, user, days=7):
-        """Get recent unread messages for a user."""
-        return self.get_queryset().for_user(user).unread_only().recent(days).with_sender_info()
+        """Get recent unread messages for a user, newest first."""
+        return self.get_queryset().for_user(user).unread_only().recent(days).with_sender_info().order_by(
+            '-timestamp'
+        )
     
     def mark_as_read_for_user(self, user, message_ids=None):
         """
@@ -120,10 +200,32 @@ class UnreadMessagesManager(models.Manager):
         If message_ids provided, mark only those messages.
         """
         queryset = self.get_queryset().for_user(user).unread_only()
-        if message_ids:
-            queryset = queryset.filter(message_id__in=message_ids)
-        
-        return queryset.update(read=True)
+        with transaction.atomic():
+            if not message_ids:
+                # Single UPDATE served by the (receiver, read) index
+                batches = [queryset]
+            else:
+                # Bound the IN (...) list so large selections don't hit parameter limits
+                message_ids = list(message_ids)
+                batches = [
+                    queryset.filter(message_id__in=message_ids[start:start + MARK_AS_READ_BATCH_SIZE])
+                    for start in range(0, len(message_ids), MARK_AS_READ_BATCH_SIZE)
+                ]
+            updated = 0
+            read_by_sender = Counter()
+            for batch in batches:
+                # Lock the rows first so the per-sender counts match what the UPDATE flips
+                read_by_sender.update(
+                    batch.select_for_update().order_by().values_list('sender_id', flat=True)
+                )
+                updated += batch.update(read=True)
+            
+            # update() skips signals, so keep the denormalized counters in step here
+            if updated:
+                User.objects.adjust_unread_count(user.pk, -updated)
+                for sender_id, count in read_by_sender.items():
+                    UnreadRollup.objects.adjust(user.pk, sender_id, -count)
+        return updated
 
 
 # Additional specialized managers
@@ -135,26 +237,64 @@ class MessageManager(models.Manager):
     def get_queryset(self):
         return MessageQuerySet(self.model, using=self._db)
     
-    def for_conversation(self, user1, user2):
-        """Get messages between two users."""
-        return self.get_queryset().filter(
-            models.Q(sender=user1, receiver=user2) |
-            models.Q(sender=user2, receiver=user1)
-        ).with_full_info().order_by('timestamp')
+    def for_conversation(self, user1, user2, cursor=None):
+        """
+        Get messages between two users, oldest first.
+        Each direction is its own (sender, receiver) range scan on msg_conv_idx,
+        combined with UNION ALL rather than an OR the planner may not index.
+        cursor is an optional Q applied to both halves; the result is a
+        combined queryset, so it can be ordered and sliced but not filtered.
+        """
+        directions = [(user1, user2)] if user1 == user2 else [(user1, user2), (user2, user1)]
+        halves = []
+        for sender, receiver in directions:
+            half = self.get_queryset().filter(sender=sender, receiver=receiver)
+            if cursor is not None:
+                half = half.filter(cursor)
+            halves.append(half.with_full_info())
+        return halves[0].union(*halves[1:], all=True).order_by('timestamp', 'id')
+    
+    def for_conversation_paged(self, user1, user2, after_ts=None, after_pk=None, limit=100):
+        """
+        Get one page of a conversation, oldest first, starting after a cursor.
+        Keyset pagination: pass the timestamp (and pk, to break ties)
+        of the last message of the previous page instead of an OFFSET.
+        """
+        cursor = None
+        if after_ts is not None:
+            if after_pk is not None:
+                cursor = (
+                    models.Q(timestamp__gt=after_ts) |
+                    models.Q(timestamp=after_ts, pk__gt=after_pk)
+                )
+            else:
+                cursor = models.Q(timestamp__gt=after_ts)
+        return self.for_conversation(user1, user2, cursor=cursor)[:limit]
     
     def unread_count_by_sender(self, user):
-        """Get count of unread messages grouped by sender."""
-        from django.db.models import Count
-        return self.get_queryset().for_user(user).unread_only().values(
-            'sender__email', 'sender__first_name', 'sender__last_name'
-        ).annotate(unread_count=Count('message_id')).order_by('-unread_count')
+        """
+        Get count of unread messages grouped by sender.
+        Reads the precomputed UnreadRollup rows, one per sender, instead of
+        grouping over the receiver's whole message history.
+        """
+        return list(
+            UnreadRollup.objects.filter(receiver=user, count__gt=0).values(
+                'sender__email', 'sender__first_name', 'sender__last_name'
+            ).annotate(
+                unread_count=F('count')
+            ).order_by('-count')
+        )
 
 
 class Message(models.Model):
     """
     Message model with read field and custom managers.
     """
-    message_id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    # Sequential bigint key keeps the primary key index append-only and makes
+    # every index entry and foreign key column 8 bytes; message_id stays the
+    # public identifier used in URLs
+    id = models.BigAutoField(primary_key=True)
+    message_id = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
     sender = models.ForeignKey(User, on_delete=models.CASCADE, related_name='messages_sent')
     receiver = models.ForeignKey(User, on_delete=models.CASCADE, related_name='messages_received')
     content = models.TextField()
@@ -169,16 +309,37 @@ class Message(models.Model):
     def __str__(self):
         return f"Message from {self.sender.email} to {self.receiver.email} at {self.timestamp}"
 
+    def delete(self, *args, **kwargs):
+        """Delete the message and its replies, then release their unread counters."""
+        with transaction.atomic():
+            unread = Message.objects.filter(pk=self.pk).unread_pair_counts()
+            deleted = super().delete(*args, **kwargs)
+            release_unread_counts(unread)
+        return deleted
+
     # Custom managers
     objects = MessageManager()  # Default manager
     unread_messages = UnreadMessagesManager()  # Task 4: Custom manager for unread messages
 
     class Meta:
-        ordering = ['-timestamp']
+        # No default ordering: COUNT/EXISTS/UPDATE queries skip the sort, and
+        # listings order explicitly (served by the timestamp indexes)
         indexes = [
             models.Index(fields=['receiver', 'read']),  # Optimize unread message queries
             models.Index(fields=['sender', 'timestamp']),  # Optimize sent message queries
             models.Index(fields=['timestamp']),  # Optimize chronological queries
+            models.Index(
+                fields=['sender', 'receiver', 'timestamp'], name='msg_conv_idx'
+            ),  # Optimize conversation queries, one direction per range scan
+            # Partial indexes covering only unread rows (skipped on backends without partial index support)
+            models.Index(
+                fields=['receiver'], condition=models.Q(read=False),
+                name='msg_unread_by_receiver_idx'
+            ),  # Optimize unread counts/lists per user
+            models.Index(
+                fields=['receiver', 'timestamp'], condition=models.Q(read=False),
+                name='msg_unread_recent_idx'
+            ),  # Optimize recent unread queries
         ]
 
 
@@ -203,6 +364,39 @@ class MessageHistory(models.Model):
         return f"History for message {self.message.message_id} edited at {self.edited_at}"
 
 
+class UnreadRollupManager(models.Manager):
+    def adjust(self, receiver_id, sender_id, delta):
+        """Atomically add delta to the unread count for a (receiver, sender) pair (never below 0)."""
+        pair = self.filter(receiver_id=receiver_id, sender_id=sender_id)
+        if pair.update(count=Greatest(F('count') + delta, Value(0))) or delta <= 0:
+            return
+        try:
+            with transaction.atomic():
+                self.create(receiver_id=receiver_id, sender_id=sender_id, count=delta)
+        except IntegrityError:
+            # Another writer created the row first; add to it instead
+            pair.update(count=F('count') + delta)
+
+
+class UnreadRollup(models.Model):
+    """
+    Unread message count per (receiver, sender), kept in step by signals and
+    mark_as_read_for_user so per-sender unread summaries read one row per sender
+    instead of grouping over every message.
+    """
+    receiver = models.ForeignKey(User, on_delete=models.CASCADE, related_name='unread_rollups')
+    sender = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    count = models.PositiveIntegerField(default=0)
+
+    objects = UnreadRollupManager()
+
+    class Meta:
+        unique_together = ('receiver', 'sender')
+
+    def __str__(self):
+        return f"{self.count} unread for {self.receiver_id} from {self.sender_id}"
+
+
 # Usage examples for the custom managers:
 
 """
@@ -227,4 +421,10 @@ def unread_messages_view(request):
 
 # Get unread count by sender
 unread_by_sender = Message.objects.unread_count_by_sender(user)
+
+# Page through a conversation without OFFSET
+page = Message.objects.for_conversation_paged(user1, user2)
+next_page = Message.objects.for_conversation_paged(
+    user1, user2, after_ts=page[len(page) - 1].timestamp, after_pk=page[len(page) - 1].pk
+)
 """
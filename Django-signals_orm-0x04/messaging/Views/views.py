@@ -3,7 +3,7 @@
 
 from django.shortcuts import render, get_object_or_404
 from django.contrib.auth.decorators import login_required
-from django.http import JsonResponse
+from django.http import HttpResponseRedirect, JsonResponse
 from django.views.decorators.http import require_http_methods
 from django.contrib.auth import get_user_model
 from django.contrib import messages
@@ -11,6 +11,7 @@ from django.urls import reverse_lazy
 from django.views.generic import DeleteView
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.db import transaction
+from django.db.models import Q
 
 User = get_user_model()
 
@@ -19,8 +20,8 @@ User = get_user_model()
 @require_http_methods(["DELETE"])
 def delete_user_view(request):
     """
-    Task 2: Delete user account view that triggers post_delete signal.
-    The signal will automatically clean up all related data including:
+    Task 2: Delete user account view.
+    CASCADE foreign keys automatically clean up all related data including:
     - Messages sent by the user
     - Messages received by the user  
     - Notifications for the user
@@ -29,8 +30,7 @@ def delete_user_view(request):
     try:
         user = request.user
         
-        # The post_delete signal in signals.py will handle cleanup automatically
-        # This includes CASCADE deletion respecting foreign key constraints
+        # CASCADE foreign keys remove all related rows in the same delete
         user.delete()
         
         return JsonResponse({
@@ -53,22 +53,24 @@ class DeleteUserView(LoginRequiredMixin, DeleteView):
     template_name = 'messaging/delete_user_confirm.html'
     success_url = reverse_lazy('login')
     
-    def get_object(self):
+    def get_object(self, queryset=None):
+        # The URL carries no pk: the account to delete is always the
+        # requester's, which the auth middleware has already loaded
         return self.request.user
     
     def delete(self, request, *args, **kwargs):
         """
         Override delete method to ensure proper cleanup.
-        The post_delete signal will handle all related data cleanup.
+        CASCADE foreign keys handle all related data cleanup.
         """
         try:
             with transaction.atomic():
-                # Get user before deletion for logging
-                user = self.get_object()
-                user_email = user.email
+                self.object = self.get_object()
+                user_email = self.object.email
                 
-                # Delete user - this triggers the post_delete signal
-                response = super().delete(request, *args, **kwargs)
+                # Delete user - related data is removed by CASCADE
+                self.object.delete()
+                response = HttpResponseRedirect(self.get_success_url())
                 
                 # Add success message
                 messages.success(
@@ -90,7 +92,7 @@ class DeleteUserView(LoginRequiredMixin, DeleteView):
 def user_deletion_confirmation(request):
     """
     View to show user deletion confirmation page with information about
-    what data will be deleted (handled by signals).
+    what data will be deleted (handled by CASCADE).
     """
     user = request.user
     
@@ -127,34 +129,39 @@ def confirm_user_deletion(request):
         })
 
 
-# Additional views for demonstrating signal-based cleanup
+# Additional views for demonstrating CASCADE-based cleanup
 
 @login_required
 def user_data_summary(request):
     """
     View to show summary of user data that would be affected by deletion.
-    This demonstrates what the post_delete signal will clean up.
+    This demonstrates what CASCADE deletion will clean up.
     """
     user = request.user
     
     from messaging.models import Message, Notification, MessageHistory
     
-    # Get user's data
-    sent_messages = Message.objects.filter(sender=user).select_related('receiver')
-    received_messages = Message.objects.filter(receiver=user).select_related('sender')
-    notifications = Notification.objects.filter(user=user).select_related('message')
+    # Plain filters for the counts: COUNT(*) without joins or extra columns
+    sent_messages = Message.objects.filter(sender=user)
+    received_messages = Message.objects.filter(receiver=user)
+    notifications = Notification.objects.filter(user=user)
     
-    # Get message history for user's messages
-    user_message_ids = list(sent_messages.values_list('message_id', flat=True)) + \
-                      list(received_messages.values_list('message_id', flat=True))
-    message_history = MessageHistory.objects.filter(message_id__in=user_message_ids)
+    # Get message history for user's messages via a join, not a Python-built IN list
+    message_history = MessageHistory.objects.filter(
+        Q(message__sender=user) | Q(message__receiver=user)
+    )
     
     context = {
         'user': user,
-        'sent_messages': sent_messages[:10],  # Show first 10
-        'received_messages': received_messages[:10],
-        'notifications': notifications[:10],
-        'message_history': message_history[:10],
+        # Show the latest 10, loading only the columns displayed
+        'sent_messages': sent_messages.select_related('receiver').only(
+            'message_id', 'content', 'timestamp', 'receiver__email'
+        ).order_by('-timestamp')[:10],
+        'received_messages': received_messages.select_related('sender').only(
+            'message_id', 'content', 'timestamp', 'sender__email'
+        ).order_by('-timestamp')[:10],
+        'notifications': notifications.select_related('message')[:10],
+        'message_history': message_history.select_related('message')[:10],
         'total_sent': sent_messages.count(),
         'total_received': received_messages.count(),
         'total_notifications': notifications.count(),
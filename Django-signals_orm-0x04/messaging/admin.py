@@ -31,9 +31,9 @@ class MessageAdmin(admin.ModelAdmin):
     list_filter = ('edited', 'read', 'timestamp')
     search_fields = ('sender__email', 'receiver__email', 'content')
     readonly_fields = ('message_id', 'timestamp')
-    
-    def get_queryset(self, request):
-        return super().get_queryset(request).select_related('sender', 'receiver', 'parent_message')
+    ordering = ('-timestamp',)
+    # Only the relations rendered by list_display are joined on the changelist
+    list_select_related = ('sender', 'receiver')
 
 
 @admin.register(Notification)
@@ -42,6 +42,8 @@ class NotificationAdmin(admin.ModelAdmin):
     list_filter = ('is_read', 'created_at')
     search_fields = ('user__email', 'message__content')
     readonly_fields = ('notification_id', 'created_at')
+    # str(message) renders the sender and receiver emails
+    list_select_related = ('user', 'message__sender', 'message__receiver')
 
 
 @admin.register(MessageHistory)
@@ -7,3 +7,7 @@ class MessagingConfig(AppConfig):
 
     def ready(self):
         import messaging.signals
+        from django.conf import settings
+        if getattr(settings, 'MESSAGE_HISTORY_ASYNC', False):
+            from messaging.history_queue import start_worker
+            start_worker()
@@ -0,0 +1,69 @@
+import logging
+import queue
+import threading
+
+from django.db import close_old_connections
+from django.utils import timezone
+from .models import MessageHistory
+
+logger = logging.getLogger(__name__)
+
+# Largest number of history rows written by one bulk INSERT
+HISTORY_BATCH_SIZE = 500
+
+_pending = queue.Queue()
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def enqueue_history(message_pk, old_content):
+    """
+    Queue a MessageHistory row to be written outside the request.
+    The edit time is captured now, not when the row is written.
+    """
+    _pending.put(MessageHistory(
+        message_id=message_pk,
+        old_content=old_content,
+        edited_at=timezone.now()
+    ))
+
+
+def flush(batch_size=HISTORY_BATCH_SIZE, first=None):
+    """
+    Write up to batch_size queued history rows in one bulk_create.
+    Returns the number of rows written.
+    """
+    rows = [] if first is None else [first]
+    while len(rows) < batch_size:
+        try:
+            rows.append(_pending.get_nowait())
+        except queue.Empty:
+            break
+    if rows:
+        MessageHistory.objects.bulk_create(rows)
+    return len(rows)
+
+
+def _run():
+    while True:
+        # Block until there is work, then batch whatever else arrived meanwhile
+        first = _pending.get()
+        close_old_connections()
+        try:
+            while flush(first=first) == HISTORY_BATCH_SIZE:
+                first = None
+        except Exception:
+            logger.exception("Failed to write queued message history")
+        finally:
+            close_old_connections()
+
+
+def start_worker():
+    """
+    Start the daemon thread that drains the history queue (once per process).
+    """
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = threading.Thread(target=_run, name='message-history-writer', daemon=True)
+            _worker.start()
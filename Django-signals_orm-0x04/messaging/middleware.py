@@ -0,0 +1,38 @@
+from django.utils.deprecation import MiddlewareMixin
+from .models import User
+
+
+class UnreadCountCacheMiddleware(MiddlewareMixin):
+    """
+    Middleware that gives each request its own unread-count cache, so the
+    unread_count lookup runs at most once per user per request.
+    """
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+        super().__init__(get_response)
+    
+    def __call__(self, request):
+        request._unread_count_cache = {}
+        response = self.get_response(request)
+        return response
+
+
+def _read_unread_count(user):
+    # Read the denormalized column by primary key rather than trusting the
+    # passed instance, which may have been loaded before the counter moved
+    return User.objects.filter(pk=user.pk).values_list('unread_count', flat=True).first() or 0
+
+
+def get_unread_count(request, user):
+    """
+    Return the number of unread messages for user, memoized on the request.
+    The value is the denormalized User.unread_count, so no COUNT(*) runs.
+    Falls back to reading it every time if UnreadCountCacheMiddleware is not installed.
+    """
+    cache = getattr(request, '_unread_count_cache', None)
+    if cache is None:
+        return _read_unread_count(user)
+    if user.pk not in cache:
+        cache[user.pk] = _read_unread_count(user)
+    return cache[user.pk]
@@ -1,6 +1,9 @@
 import uuid
-from django.db import models
+from collections import Counter
+from django.db import IntegrityError, models, transaction
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin, BaseUserManager
+from django.db.models import Count, F, Value
+from django.db.models.functions import Greatest
 from django.utils import timezone
 
 
@@ -19,6 +22,12 @@ class CustomUserManager(BaseUserManager):
         extra_fields.setdefault('is_superuser', True)
         return self.create_user(email, password, **extra_fields)
 
+    def adjust_unread_count(self, user_id, delta):
+        """Atomically add delta to a user's denormalized unread_count (never below 0)."""
+        return self.filter(pk=user_id).update(
+            unread_count=Greatest(F('unread_count') + delta, Value(0))
+        )
+
 
 class User(AbstractBaseUser, PermissionsMixin):
     user_id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -28,6 +37,9 @@ class User(AbstractBaseUser, PermissionsMixin):
     is_active = models.BooleanField(default=True)
     is_staff = models.BooleanField(default=False)
     date_joined = models.DateTimeField(default=timezone.now)
+    # Denormalized count of unread received messages, kept in step by signals
+    # and the Message delete paths so the unread badge needs no COUNT(*) query
+    unread_count = models.PositiveIntegerField(default=0)
 
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['first_name', 'last_name']
@@ -38,8 +50,94 @@ class User(AbstractBaseUser, PermissionsMixin):
         return self.email
 
 
+def release_unread_counts(unread, deleted_user_id=None):
+    """
+    Take deleted unread messages off UnreadRollup and User.unread_count, one
+    UPDATE per (receiver_id, sender_id) pair and per receiver. Counters owned
+    by deleted_user_id are skipped; they cascade away with the user.
+    """
+    by_receiver = Counter()
+    for (receiver_id, sender_id), count in unread.items():
+        if receiver_id != deleted_user_id:
+            by_receiver[receiver_id] += count
+        if deleted_user_id not in (receiver_id, sender_id):
+            UnreadRollup.objects.adjust(receiver_id, sender_id, -count)
+    for receiver_id, count in by_receiver.items():
+        User.objects.adjust_unread_count(receiver_id, -count)
+
+
+class MessageQuerySet(models.QuerySet):
+    def for_conversation(self, user1, user2, cursor=None):
+        """
+        Get messages between two users, oldest first.
+        Each direction is its own (sender, receiver) range scan on msg_conv_idx,
+        combined with UNION ALL rather than an OR the planner may not index.
+        cursor is an optional Q applied to both halves; the result is a
+        combined queryset, so it can be ordered and sliced but not filtered.
+        """
+        directions = [(user1, user2)] if user1 == user2 else [(user1, user2), (user2, user1)]
+        halves = []
+        for sender, receiver in directions:
+            half = self.filter(sender=sender, receiver=receiver)
+            if cursor is not None:
+                half = half.filter(cursor)
+            halves.append(half.select_related('sender', 'receiver'))
+        return halves[0].union(*halves[1:], all=True).order_by('timestamp', 'id')
+
+    def for_conversation_paged(self, user1, user2, after_ts=None, after_pk=None, limit=100):
+        """
+        Get one page of a conversation, oldest first, starting after a cursor.
+        Keyset pagination: pass the timestamp (and pk, to break ties)
+        of the last message of the previous page instead of an OFFSET.
+        """
+        cursor = None
+        if after_ts is not None:
+            if after_pk is not None:
+                cursor = (
+                    models.Q(timestamp__gt=after_ts) |
+                    models.Q(timestamp=after_ts, pk__gt=after_pk)
+                )
+            else:
+                cursor = models.Q(timestamp__gt=after_ts)
+        return self.for_conversation(user1, user2, cursor=cursor)[:limit]
+
+    def unread_pair_counts(self):
+        """
+        Count unread messages per (receiver_id, sender_id) across these
+        messages and every reply below them: the rows deleting them removes.
+        """
+        counts = Counter()
+        seen = set()
+        level = set(self.values_list('pk', flat=True))
+        while level:
+            seen |= level
+            unread = Message.objects.filter(pk__in=level, read=False).values_list(
+                'receiver_id', 'sender_id'
+            ).annotate(count=Count('pk')).order_by()
+            counts.update({(receiver_id, sender_id): count for receiver_id, sender_id, count in unread})
+            replies = Message.objects.filter(parent_message_id__in=level).values_list('pk', flat=True)
+            level = set(replies) - seen
+        return counts
+
+    def delete(self):
+        """
+        Delete the messages and release their unread counters in one grouped
+        pass rather than by a per-row post_delete receiver, which would cost
+        two UPDATEs per deleted row.
+        """
+        with transaction.atomic(using=self.db):
+            unread = self.unread_pair_counts()
+            deleted = super().delete()
+            release_unread_counts(unread)
+        return deleted
+
+
 class Message(models.Model):
-    message_id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    # Sequential bigint key keeps the primary key index append-only and makes
+    # every index entry and foreign key column 8 bytes; message_id stays the
+    # public identifier used in URLs
+    id = models.BigAutoField(primary_key=True)
+    message_id = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
     sender = models.ForeignKey(User, on_delete=models.CASCADE, related_name='messages_sent')
     receiver = models.ForeignKey(User, on_delete=models.CASCADE, related_name='messages_received')
     content = models.TextField()
@@ -48,9 +146,60 @@ class Message(models.Model):
     read = models.BooleanField(default=False)
     parent_message = models.ForeignKey('self', on_delete=models.CASCADE, null=True, blank=True, related_name='replies')
 
+    objects = MessageQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['sender', 'receiver', 'timestamp'], name='msg_conv_idx'
+            ),  # Conversation reads, one direction per range scan
+            # Partial indexes covering only unread rows
+            models.Index(
+                fields=['receiver'], condition=models.Q(read=False),
+                name='msg_unread_by_receiver_idx'
+            ),  # Unread counts per user
+            models.Index(
+                fields=['receiver', 'timestamp'], condition=models.Q(read=False),
+                name='msg_unread_recent_idx'
+            ),  # Unread listings, newest first
+        ]
+
     def __str__(self):
         return f"Message from {self.sender.email} to {self.receiver.email} at {self.timestamp}"
 
+    def delete(self, *args, **kwargs):
+        """Delete the message and its replies, then release their unread counters."""
+        with transaction.atomic():
+            unread = Message.objects.filter(pk=self.pk).unread_pair_counts()
+            deleted = super().delete(*args, **kwargs)
+            release_unread_counts(unread)
+        return deleted
+
+    @classmethod
+    def bulk_create_with_notifications(cls, messages):
+        """
+        Insert messages and a notification for each receiver in two bulk INSERTs.
+        bulk_create() does not send post_save, so the notifications and unread
+        counts that the signals would maintain are handled here.
+        """
+        with transaction.atomic():
+            messages = cls.objects.bulk_create(messages)
+            Notification.objects.bulk_create([
+                Notification(user_id=message.receiver_id, message=message)
+                for message in messages
+            ])
+            # post_save is skipped too, so bump each receiver's unread_count once
+            unread_pairs = Counter(
+                (message.receiver_id, message.sender_id) for message in messages if not message.read
+            )
+            unread_by_receiver = Counter()
+            for (receiver_id, sender_id), count in unread_pairs.items():
+                UnreadRollup.objects.adjust(receiver_id, sender_id, count)
+                unread_by_receiver[receiver_id] += count
+            for receiver_id, count in unread_by_receiver.items():
+                User.objects.adjust_unread_count(receiver_id, count)
+        return messages
+
 
 class Notification(models.Model):
     notification_id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -73,6 +222,39 @@ class MessageHistory(models.Model):
         return f"History for message {self.message.message_id} edited at {self.edited_at}"
 
 
+class UnreadRollupManager(models.Manager):
+    def adjust(self, receiver_id, sender_id, delta):
+        """Atomically add delta to the unread count for a (receiver, sender) pair (never below 0)."""
+        pair = self.filter(receiver_id=receiver_id, sender_id=sender_id)
+        if pair.update(count=Greatest(F('count') + delta, Value(0))) or delta <= 0:
+            return
+        try:
+            with transaction.atomic():
+                self.create(receiver_id=receiver_id, sender_id=sender_id, count=delta)
+        except IntegrityError:
+            # Another writer created the row first; add to it instead
+            pair.update(count=F('count') + delta)
+
+
+class UnreadRollup(models.Model):
+    """
+    Unread message count per (receiver, sender), kept in step by signals and
+    the Message delete paths so per-sender unread summaries read one row per
+    sender instead of grouping over every message.
+    """
+    receiver = models.ForeignKey(User, on_delete=models.CASCADE, related_name='unread_rollups')
+    sender = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    count = models.PositiveIntegerField(default=0)
+
+    objects = UnreadRollupManager()
+
+    class Meta:
+        unique_together = ('receiver', 'sender')
+
+    def __str__(self):
+        return f"{self.count} unread for {self.receiver_id} from {self.sender_id}"
+
+
 # Custom Manager for Unread Messages
 class UnreadMessagesManager(models.Manager):
     def for_user(self, user):
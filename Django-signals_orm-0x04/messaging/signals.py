@@ -1,9 +1,17 @@
-from django.db.models.signals import post_save, pre_save, post_delete
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import post_save, pre_save, pre_delete
 from django.dispatch import receiver
-from django.contrib.auth import get_user_model
-from .models import Message, Notification, MessageHistory
+from .models import (
+    User, Message, Notification, MessageHistory, UnreadRollup, release_unread_counts,
+)
+from .history_queue import enqueue_history
 
-User = get_user_model()
+# Task 2 (user deletion cleanup): every Message, Notification and
+# MessageHistory foreign key uses on_delete=CASCADE, so User.delete()
+# already removes the related rows; only the other users' unread counters
+# need a handler.
 
 
 @receiver(post_save, sender=Message)
@@ -19,39 +27,76 @@ def create_notification_on_message(sender, instance, created, **kwargs):
         )
 
 
+@receiver(post_save, sender=Message)
+def increment_unread_count_on_message(sender, instance, created, **kwargs):
+    """
+    Count a new unread message on the receiver's denormalized unread_count
+    and on the per-sender UnreadRollup.
+    """
+    if created and not instance.read:
+        User.objects.adjust_unread_count(instance.receiver_id, 1)
+        UnreadRollup.objects.adjust(instance.receiver_id, instance.sender_id, 1)
+
+
+@receiver(pre_delete, sender=User)
+def release_unread_counts_on_user_delete(sender, instance, **kwargs):
+    """
+    Take the deleted user's cascading unread messages off the other users'
+    counters with one grouped UPDATE per affected receiver and pair, instead
+    of a per-row post_delete receiver on Message.
+    """
+    messages = Message.objects.filter(Q(sender=instance) | Q(receiver=instance))
+    release_unread_counts(messages.unread_pair_counts(), deleted_user_id=instance.pk)
+
+
 @receiver(pre_save, sender=Message)
 def log_message_edit(sender, instance, **kwargs):
     """
     Task 1: Log message edits by saving old content to MessageHistory.
+    With MESSAGE_HISTORY_ASYNC the row is queued once the edit commits and
+    written in batches by the history worker instead of inside save().
+    The stored read flag is kept on the instance for
+    adjust_unread_count_on_read_change. With save(update_fields=...) only the
+    listed columns are written, so only those are compared.
     """
-    if instance.pk:  # Only for existing messages (updates)
-        try:
-            old_message = Message.objects.get(pk=instance.pk)
-            if old_message.content != instance.content:
-                # Message content has changed, log the old content
+    update_fields = kwargs.get('update_fields')
+    writes_content = update_fields is None or 'content' in update_fields
+    writes_read = update_fields is None or 'read' in update_fields
+    if instance.pk and (writes_content or writes_read):  # Only for existing messages (updates)
+        # Fetch only the stored columns that are compared, not the whole row
+        old_values = Message.objects.filter(pk=instance.pk).values_list(
+            'content', 'read'
+        ).first()
+        if old_values is None:
+            return
+        old_content, old_read = old_values
+        if writes_read:
+            instance._stored_read = old_read
+        if writes_content and old_content != instance.content:
+            # Message content has changed, log the old content
+            if getattr(settings, 'MESSAGE_HISTORY_ASYNC', False):
+                message_pk = instance.pk
+                transaction.on_commit(lambda: enqueue_history(message_pk, old_content))
+            else:
                 MessageHistory.objects.create(
                     message=instance,
-                    old_content=old_message.content
+                    old_content=old_content
                 )
-                instance.edited = True
-        except Message.DoesNotExist:
-            pass
-
-
-@receiver(post_delete, sender=User)
-def cleanup_user_data(sender, instance, **kwargs):
-    """
-    Task 2: Clean up related data when a user is deleted.
-    """
-    # Delete all messages sent by the user
-    Message.objects.filter(sender=instance).delete()
-    
-    # Delete all messages received by the user
-    Message.objects.filter(receiver=instance).delete()
-    
-    # Delete all notifications for the user
-    Notification.objects.filter(user=instance).delete()
-    
-    # Delete message history for messages that were sent/received by the user
-    MessageHistory.objects.filter(message__sender=instance).delete()
-    MessageHistory.objects.filter(message__receiver=instance).delete()
+            instance.edited = True
+
+
+@receiver(post_save, sender=Message)
+def adjust_unread_count_on_read_change(sender, instance, created, **kwargs):
+    """
+    Keep the receiver's unread counters in step when save() flips read.
+    Runs after the row is written, so a failed save leaves them untouched.
+    """
+    stored_read = instance.__dict__.pop('_stored_read', None)
+    update_fields = kwargs.get('update_fields')
+    if update_fields is not None and 'read' not in update_fields:
+        return
+    if created or stored_read is None or stored_read == instance.read:
+        return
+    delta = -1 if instance.read else 1
+    User.objects.adjust_unread_count(instance.receiver_id, delta)
+    UnreadRollup.objects.adjust(instance.receiver_id, instance.sender_id, delta)
@@ -1,8 +1,15 @@
-from django.test import TestCase
+import json
+
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
 from django.contrib.auth import get_user_model
 from django.db.models.signals import post_save, pre_save, post_delete
 from django.dispatch import receiver
-from .models import Message, Notification, MessageHistory
+from django.urls import reverse
+from django.utils import timezone
+from .models import Message, Notification, MessageHistory, UnreadRollup
+from .middleware import UnreadCountCacheMiddleware, get_unread_count
+from . import history_queue
 
 User = get_user_model()
 
@@ -60,6 +67,27 @@ class SignalTests(TestCase):
         message.refresh_from_db()
         self.assertTrue(message.edited)
 
+    @override_settings(MESSAGE_HISTORY_ASYNC=True)
+    def test_message_edit_logging_queued(self):
+        """Test that queued message edits are written to MessageHistory on flush."""
+        message = Message.objects.create(
+            sender=self.user1,
+            receiver=self.user2,
+            content='Original content'
+        )
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            message.content = 'Edited content'
+            message.save()
+        
+        # Nothing is written until the queue is drained
+        self.assertFalse(MessageHistory.objects.filter(message=message).exists())
+        self.assertEqual(history_queue.flush(), 1)
+        self.assertTrue(MessageHistory.objects.filter(
+            message=message,
+            old_content='Original content'
+        ).exists())
+
     def test_user_deletion_cleanup(self):
         """Test that user deletion cleans up related data."""
         # Create a message
@@ -75,13 +103,112 @@ class SignalTests(TestCase):
             message=message
         )
         
-        # Delete user1
+        # Delete user1 (keep the pk: deleted instances can't be used in filters)
+        user1_pk = self.user1.pk
         self.user1.delete()
         
         # Check that related data was cleaned up
-        self.assertFalse(Message.objects.filter(sender=self.user1).exists())
+        self.assertFalse(Message.objects.filter(sender_id=user1_pk).exists())
         self.assertFalse(Notification.objects.filter(message=message).exists())
 
+    def test_user_deletion_releases_unread_counts_in_bulk(self):
+        """Test that deleting a user updates the other receivers' counters once each, not per message."""
+        user3 = User.objects.create_user(
+            email='user3@test.com',
+            password='testpass123',
+            first_name='User',
+            last_name='Three'
+        )
+        Message.bulk_create_with_notifications([
+            Message(sender=self.user1, receiver=self.user2 if i % 2 else user3, content=f'Message {i}')
+            for i in range(100)
+        ])
+        Message.objects.create(sender=self.user2, receiver=self.user1, content='Reply')
+
+        # Cascade SELECTs and DELETEs, plus one counter UPDATE per other receiver
+        with self.assertNumQueries(21):
+            self.user1.delete()
+
+        self.user2.refresh_from_db()
+        user3.refresh_from_db()
+        self.assertEqual(self.user2.unread_count, 0)
+        self.assertEqual(user3.unread_count, 0)
+        self.assertFalse(UnreadRollup.objects.exists())
+
+    def test_unread_count_tracks_message_lifecycle(self):
+        """Test that the receiver's unread_count follows create, read and delete."""
+        message = Message.objects.create(
+            sender=self.user1,
+            receiver=self.user2,
+            content='Unread message'
+        )
+        self.user2.refresh_from_db()
+        self.assertEqual(self.user2.unread_count, 1)
+        
+        message.read = True
+        message.save()
+        self.user2.refresh_from_db()
+        self.assertEqual(self.user2.unread_count, 0)
+        
+        unread = Message.objects.create(
+            sender=self.user1,
+            receiver=self.user2,
+            content='Another unread message'
+        )
+        unread.delete()
+        self.user2.refresh_from_db()
+        self.assertEqual(self.user2.unread_count, 0)
+
+    def test_unread_count_ignores_read_left_out_of_update_fields(self):
+        """Test that a read flag not written by save(update_fields=...) leaves the counters alone."""
+        message = Message.objects.create(
+            sender=self.user1,
+            receiver=self.user2,
+            content='Unread message'
+        )
+        
+        message.read = True
+        message.content = 'Edited content'
+        message.save(update_fields=['content'])
+        
+        self.user2.refresh_from_db()
+        self.assertFalse(Message.objects.get(pk=message.pk).read)
+        self.assertEqual(self.user2.unread_count, 1)
+        self.assertEqual(
+            UnreadRollup.objects.get(receiver=self.user2, sender=self.user1).count,
+            1
+        )
+        self.assertTrue(MessageHistory.objects.filter(message=message).exists())
+        
+        message.save(update_fields=['read'])
+        self.user2.refresh_from_db()
+        self.assertEqual(self.user2.unread_count, 0)
+
+    def test_unread_rollup_tracks_message_lifecycle(self):
+        """Test that the per-sender unread rollup follows create, read and delete."""
+        def rollup_count():
+            return UnreadRollup.objects.get(receiver=self.user2, sender=self.user1).count
+        
+        first = Message.objects.create(
+            sender=self.user1,
+            receiver=self.user2,
+            content='First unread message'
+        )
+        second = Message.objects.create(
+            sender=self.user1,
+            receiver=self.user2,
+            content='Second unread message'
+        )
+        self.assertEqual(rollup_count(), 2)
+        
+        first.read = True
+        first.save()
+        self.assertEqual(rollup_count(), 1)
+        
+        second.delete()
+        self.assertEqual(rollup_count(), 0)
+        self.assertFalse(UnreadRollup.objects.filter(receiver=self.user1).exists())
+
 
 class ModelTests(TestCase):
     def setUp(self):
@@ -154,3 +281,117 @@ class ModelTests(TestCase):
         unread_messages = Message.unread_messages.for_user(self.user2)
         self.assertEqual(unread_messages.count(), 1)
         self.assertEqual(unread_messages.first().content, 'Unread message')
+
+    def test_bulk_create_with_notifications(self):
+        """Test bulk message creation adds exactly one notification per message."""
+        messages = Message.bulk_create_with_notifications([
+            Message(sender=self.user1, receiver=self.user2, content=f'Message {i}')
+            for i in range(3)
+        ])
+        
+        self.assertEqual(Message.objects.count(), 3)
+        self.assertEqual(
+            Notification.objects.filter(user=self.user2, message__in=messages).count(),
+            3
+        )
+        self.user2.refresh_from_db()
+        self.assertEqual(self.user2.unread_count, 3)
+        self.assertEqual(
+            UnreadRollup.objects.get(receiver=self.user2, sender=self.user1).count,
+            3
+        )
+
+    def test_for_conversation_paged(self):
+        """Test keyset pages cover both directions once each, oldest first, across equal timestamps."""
+        sent_at = timezone.now()
+        Message.bulk_create_with_notifications([
+            Message(
+                sender=self.user1 if i % 2 else self.user2,
+                receiver=self.user2 if i % 2 else self.user1,
+                content=f'Message {i}',
+                timestamp=sent_at
+            )
+            for i in range(5)
+        ])
+        
+        first_page = list(Message.objects.for_conversation_paged(self.user1, self.user2, limit=3))
+        last = first_page[-1]
+        second_page = list(Message.objects.for_conversation_paged(
+            self.user1, self.user2, after_ts=last.timestamp, after_pk=last.pk, limit=3
+        ))
+        
+        self.assertEqual(len(first_page), 3)
+        self.assertEqual(
+            [message.content for message in first_page + second_page],
+            [f'Message {i}' for i in range(5)]
+        )
+
+
+class ConversationExportTests(TestCase):
+    def setUp(self):
+        self.user1 = User.objects.create_user(
+            email='user1@test.com',
+            password='testpass123',
+            first_name='User',
+            last_name='One'
+        )
+        self.user2 = User.objects.create_user(
+            email='user2@test.com',
+            password='testpass123',
+            first_name='User',
+            last_name='Two'
+        )
+        self.user3 = User.objects.create_user(
+            email='user3@test.com',
+            password='testpass123',
+            first_name='User',
+            last_name='Three'
+        )
+
+    def test_conversation_export_streams_ndjson(self):
+        """Test that the export streams both directions of one conversation, oldest first."""
+        Message.objects.create(sender=self.user1, receiver=self.user2, content='Hello')
+        Message.objects.create(sender=self.user2, receiver=self.user1, content='Hi back')
+        Message.objects.create(sender=self.user3, receiver=self.user1, content='Unrelated')
+        
+        self.client.force_login(self.user1)
+        response = self.client.get(reverse('conversation_export', args=[self.user2.user_id]))
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual([row['content'] for row in rows], ['Hello', 'Hi back'])
+        self.assertEqual(rows[0]['sender'], 'user1@test.com')
+        self.assertEqual(rows[1]['receiver'], 'user1@test.com')
+
+
+class UnreadCountCacheTests(TestCase):
+    def setUp(self):
+        self.user1 = User.objects.create_user(
+            email='user1@test.com',
+            password='testpass123',
+            first_name='User',
+            last_name='One'
+        )
+        self.user2 = User.objects.create_user(
+            email='user2@test.com',
+            password='testpass123',
+            first_name='User',
+            last_name='Two'
+        )
+
+    def test_unread_count_queried_once_per_request(self):
+        """Test that repeated unread counts within a request hit the database once."""
+        Message.objects.create(
+            sender=self.user1,
+            receiver=self.user2,
+            content='Unread message'
+        )
+        
+        def view(request):
+            with self.assertNumQueries(1):
+                self.assertEqual(get_unread_count(request, self.user2), 1)
+                self.assertEqual(get_unread_count(request, self.user2), 1)
+            return HttpResponse()
+        
+        UnreadCountCacheMiddleware(view)(RequestFactory().get('/'))
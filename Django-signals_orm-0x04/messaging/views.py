@@ -1,58 +1,95 @@
+import json
+
 from django.shortcuts import render, get_object_or_404
 from django.contrib.auth.decorators import login_required
-from django.http import JsonResponse
-from django.views.decorators.cache import cache_page
+from django.http import JsonResponse, StreamingHttpResponse
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
 from django.views.decorators.http import require_http_methods
 from django.contrib.auth import get_user_model
-from django.db.models import Prefetch, Q
+from django.db.models import Count, Max, Prefetch, Q
 from .models import Message, Notification, MessageHistory
 
 User = get_user_model()
 
+# Seconds a cached conversation thread is kept
+CONVERSATION_CACHE_TIMEOUT = 60
+
 
-@cache_page(60)  # Cache for 60 seconds
 def conversation_messages(request, user_id):
     """
     Task 5: Cached view to display messages in a conversation.
     Uses advanced ORM techniques with prefetch_related for optimization.
+    The thread is cached per (user, other user, newest message), so users never
+    see each other's cached pages and a new message invalidates immediately.
     """
     other_user = get_object_or_404(User, user_id=user_id)
     
-    # Get messages between current user and other user
-    messages = Message.objects.filter(
+    conversation = Message.objects.filter(
         Q(sender=request.user, receiver=other_user) |
         Q(sender=other_user, receiver=request.user)
-    ).select_related('sender', 'receiver', 'parent_message').prefetch_related(
-        'replies__sender',
-        'replies__receiver',
-        'history'
-    ).order_by('timestamp')
+    )
+    # Cheap indexed aggregate; the count also changes the key when a message is deleted
+    latest = conversation.aggregate(last_ts=Max('timestamp'), total=Count('message_id'))
+    last_ts = latest['last_ts'].timestamp() if latest['last_ts'] else 0
+    cache_key = f"conv:{request.user.pk}:{other_user.pk}:{last_ts}:{latest['total']}"
+    
+    def fetch_messages():
+        # Top-level messages only; replies are loaded by a single batched
+        # prefetch, already ordered for display
+        return list(conversation.filter(parent_message__isnull=True).select_related(
+            'sender', 'receiver'
+        ).prefetch_related(
+            Prefetch(
+                'replies',
+                queryset=Message.objects.select_related('sender', 'receiver').order_by('timestamp')
+            ),
+            'history'
+        ).order_by('timestamp'))
     
-    # Get threaded messages (messages with replies)
-    threaded_messages = []
-    for message in messages:
-        if not message.parent_message:  # Top-level message
-            threaded_messages.append({
-                'message': message,
-                'replies': message.replies.all().order_by('timestamp')
-            })
+    # Edits keep the key, so they show up once the 60 second timeout expires
+    messages = cache.get_or_set(cache_key, fetch_messages, CONVERSATION_CACHE_TIMEOUT)
     
+    # Templates iterate message.replies.all(), which is served from the prefetch cache
     return render(request, 'messaging/conversation.html', {
-        'messages': threaded_messages,
+        'messages': messages,
         'other_user': other_user
     })
 
 
+@login_required
+def conversation_export(request, user_id):
+    """
+    Stream a whole conversation as JSON lines, oldest first.
+    Rows are fetched 500 at a time with iterator(), so memory stays flat and
+    the first line is sent as soon as the first chunk is read.
+    """
+    other_user = get_object_or_404(User, user_id=user_id)
+    messages_qs = Message.objects.for_conversation(request.user, other_user)
+    
+    def rows():
+        for message in messages_qs.iterator(chunk_size=500):
+            yield json.dumps({
+                'message_id': message.message_id,
+                'sender': message.sender.email,
+                'receiver': message.receiver.email,
+                'content': message.content,
+                'timestamp': message.timestamp,
+            }, cls=DjangoJSONEncoder) + '\n'
+    
+    return StreamingHttpResponse(rows(), content_type='application/x-ndjson')
+
+
 @login_required
 @require_http_methods(["DELETE"])
 def delete_user(request):
     """
     Task 2: Delete user account and clean up related data.
-    The post_delete signal will handle the cleanup automatically.
+    CASCADE foreign keys remove the user's messages, notifications and history.
     """
     try:
         user = request.user
-        user.delete()  # This will trigger the post_delete signal
+        user.delete()  # Related data is removed by CASCADE
         return JsonResponse({'message': 'User account deleted successfully'})
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
@@ -62,10 +99,12 @@ def delete_user(request):
 def unread_messages(request):
     """
     Task 4: Display unread messages using custom manager.
+    Rows are dicts (message_id, content, timestamp, sender__email) so the
+    sender email is read from the join instead of one query per message.
     """
-    unread_messages = Message.unread_messages.for_user(request.user).only(
-        'message_id', 'sender__email', 'content', 'timestamp'
-    )
+    unread_messages = Message.unread_messages.for_user(request.user).values(
+        'message_id', 'content', 'timestamp', 'sender__email'
+    ).order_by('-timestamp')
     
     return render(request, 'messaging/unread_messages.html', {
         'unread_messages': unread_messages
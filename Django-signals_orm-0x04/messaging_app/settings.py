@@ -39,6 +39,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'messaging.middleware.UnreadCountCacheMiddleware',
 ]
 
 ROOT_URLCONF = 'messaging_app.urls'
@@ -97,6 +98,10 @@ STATIC_URL = 'static/'
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Write MessageHistory rows from a background worker instead of inside
+# Message.save(). Leave off where history must be visible as soon as save() returns.
+MESSAGE_HISTORY_ASYNC = False
+
 # Caching configuration
 CACHES = {
     'default': {
@@ -1,11 +1,40 @@
+from functools import lru_cache
+
 import django_filters
+from rest_framework import filters
 from .models import Message
 
 class MessageFilter(django_filters.FilterSet):
     sent_after = django_filters.IsoDateTimeFilter(field_name='sent_at', lookup_expr='gte')
-    sent_before = django_filters.IsoDateTimeFilter(field_name='sent_at', lookup_expr='lte')
+    # Half-open range: sent_after <= sent_at < sent_before
+    sent_before = django_filters.IsoDateTimeFilter(field_name='sent_at', lookup_expr='lt')
     sender_email = django_filters.CharFilter(field_name='sender__email', lookup_expr='icontains')
 
     class Meta:
         model = Message
         fields = ['sent_after', 'sent_before', 'sender_email']
+
+
+class CachedSearchFilter(filters.SearchFilter):
+    """
+    SearchFilter that resolves each search field to its ORM lookup once per
+    process instead of walking the model fields on every request, and parses
+    the search terms at most once per request.
+    """
+
+    def construct_search(self, field_name, queryset):
+        return _search_lookup(type(self), queryset.model, field_name)
+
+    def get_search_terms(self, request):
+        value = request.query_params.get(self.search_param, '')
+        cached = getattr(request, '_search_terms', None)
+        if cached is None or cached[0] != value:
+            cached = (value, super().get_search_terms(request))
+            request._search_terms = cached
+        return cached[1]
+
+
+@lru_cache(maxsize=64)
+def _search_lookup(filter_class, model, field_name):
+    # The lookup only depends on the model's fields, not on the queryset's rows
+    return super(CachedSearchFilter, filter_class()).construct_search(field_name, model._default_manager.none())
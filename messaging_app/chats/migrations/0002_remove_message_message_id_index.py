@@ -0,0 +1,16 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chats', '0001_initial'),
+    ]
+
+    operations = [
+        # message_id is the primary key, which already has its own index
+        migrations.RemoveIndex(
+            model_name='message',
+            name='chats_messa_message_a35d94_idx',
+        ),
+    ]
@@ -1,4 +1,4 @@
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import CursorPagination, PageNumberPagination
 from rest_framework.response import Response
 
 class MessagePagination(PageNumberPagination):
@@ -13,3 +13,14 @@ class MessagePagination(PageNumberPagination):
             'previous': self.get_previous_link(),
             'results': data
         })
+
+
+class ConversationPagination(MessagePagination):
+    page_size = 50
+
+
+class MessageCursorPagination(CursorPagination):
+    # Keyset pages over the (conversation, -sent_at) index: deep pages cost the
+    # same as the first, unlike OFFSET
+    page_size = 50
+    ordering = '-sent_at'
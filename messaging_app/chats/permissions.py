@@ -6,5 +6,5 @@ class IsParticipantOfConversation(permissions.BasePermission):
     """
     def has_object_permission(self, request, view, obj):
         # Check if the user is a participant of the conversation.
-        # obj.participants is a ManyToMany field, so we use .all() to get the list of users.
-        return request.user in obj.participants.all()
\ No newline at end of file
+        # Let the database answer with an EXISTS query instead of loading every participant.
+        return obj.participants.filter(pk=request.user.pk).exists()
\ No newline at end of file
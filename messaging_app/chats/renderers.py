@@ -0,0 +1,29 @@
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    orjson = None
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer that encodes with orjson when it is installed.
+    Types orjson can't handle natively (Decimal, lazy strings, ...) go through
+    DRF's JSONEncoder, so the output matches the default renderer.
+    """
+    _encoder = JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+        # Non-str keys are stringified like the stdlib encoder does; DRF keys
+        # ListField errors by item index, e.g. {"participant_ids": {0: [...]}}
+        return orjson.dumps(
+            data,
+            default=self._encoder.default,
+            option=orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS,
+        )
@@ -0,0 +1,27 @@
+from django.db.models.signals import m2m_changed
+from django.dispatch import receiver
+from django.utils import timezone
+from .models import Conversation
+
+
+@receiver(m2m_changed, sender=Conversation.participants.through)
+def touch_conversation_on_participants_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Bump updated_at when participants are added, removed or cleared, so the
+    conversation ETag changes and pollers refetch the participant list.
+    bulk_create() on the through table sends no signal; it is only used for
+    new conversations, whose ETag is new anyway.
+    """
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if pk_set is not None and not pk_set:
+        return  # add() of rows that already exist, or remove() of none
+    if not reverse:
+        conversations = Conversation.objects.filter(pk=instance.pk)
+    elif pk_set is not None:
+        # user.conversations.add/remove(...): pk_set holds conversation keys
+        conversations = Conversation.objects.filter(pk__in=pk_set)
+    else:
+        # user.conversations.clear(): find them before the rows go
+        conversations = Conversation.objects.filter(participants=instance)
+    conversations.update(updated_at=timezone.now())
@@ -1,9 +1,17 @@
+import json
+import uuid
+
 from django.test import TestCase
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils import timezone
 from django.urls import reverse
-from rest_framework.test import APITestCase
+from rest_framework.test import APIRequestFactory, APITestCase, force_authenticate
 from rest_framework import status
 
+from .models import Conversation, Message
+from .views import ConversationViewSet, MessageViewSet
+
 User = get_user_model()
 
 
@@ -69,3 +77,231 @@ class APITest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertIn('access', response.data)
         self.assertIn('refresh', response.data)
+
+
+class ConversationViewSetTest(TestCase):
+    """Test cases for the conversation endpoints, called through the viewset"""
+    
+    def setUp(self):
+        """Set up users and a conversation between alice and bob"""
+        cache.clear()
+        self.factory = APIRequestFactory()
+        self.alice = User.objects.create_user(
+            email='alice@example.com', password='testpass123', first_name='Alice', last_name='A'
+        )
+        self.bob = User.objects.create_user(
+            email='bob@example.com', password='testpass123', first_name='Bob', last_name='B'
+        )
+        self.carol = User.objects.create_user(
+            email='carol@example.com', password='testpass123', first_name='Carol', last_name='C'
+        )
+        self.conversation = Conversation.objects.create()
+        self.conversation.participants.add(self.alice, self.bob)
+    
+    def call(self, actions, method, path, user, data=None, **kwargs):
+        """Run one ConversationViewSet action as user"""
+        request = getattr(self.factory, method)(path, data, format='json')
+        force_authenticate(request, user=user)
+        return ConversationViewSet.as_view(actions)(request, **kwargs)
+    
+    def list_ids(self, user):
+        response = self.call({'get': 'list'}, 'get', '/api/conversations/', user)
+        return {row['conversation_id'] for row in response.data['results']}
+    
+    def test_create_with_participant_ids(self):
+        """Test the creator is added alongside the given participants"""
+        response = self.call(
+            {'post': 'create'}, 'post', '/api/conversations/', self.alice,
+            {'participant_ids': [str(self.bob.user_id), str(self.carol.user_id)]}
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        conversation = Conversation.objects.get(pk=response.data['conversation_id'])
+        self.assertEqual(
+            set(conversation.participants.all()), {self.alice, self.bob, self.carol}
+        )
+    
+    def test_create_rejects_unknown_participant_ids(self):
+        """Test unknown participant IDs are reported and nothing is created"""
+        missing_id = uuid.uuid4()
+        response = self.call(
+            {'post': 'create'}, 'post', '/api/conversations/', self.alice,
+            {'participant_ids': [str(self.bob.user_id), str(missing_id)]}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data['participant_ids'], [f'User {missing_id} does not exist.']
+        )
+        self.assertEqual(Conversation.objects.count(), 1)
+    
+    def test_create_renders_invalid_participant_ids_as_400(self):
+        """Test per-item errors, keyed by list index, render as a 400 JSON body"""
+        response = self.call(
+            {'post': 'create'}, 'post', '/api/conversations/', self.alice,
+            {'participant_ids': ['not-a-uuid']}
+        )
+        response.render()
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(list(json.loads(response.content)['participant_ids']), ['0'])
+    
+    def test_create_requires_participant_ids(self):
+        """Test a conversation cannot be created without participants"""
+        response = self.call({'post': 'create'}, 'post', '/api/conversations/', self.alice, {})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+    
+    def test_update_rejects_participant_ids(self):
+        """Test participant_ids is refused on update instead of being silently ignored"""
+        response = self.call(
+            {'patch': 'partial_update'}, 'patch', f'/api/conversations/{self.conversation.pk}/',
+            self.alice, {'participant_ids': [str(self.carol.user_id)]}, pk=self.conversation.pk
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('participant_ids', response.data)
+        self.assertEqual(
+            set(self.conversation.participants.all()), {self.alice, self.bob}
+        )
+    
+    def test_list_is_cached_until_a_write(self):
+        """Test the cached list is served until create, update or destroy bumps the version"""
+        self.assertEqual(self.list_ids(self.alice), {str(self.conversation.pk)})
+        
+        # Written without the API, so the cached page is still served
+        hidden = Conversation.objects.create()
+        hidden.participants.add(self.alice)
+        self.assertEqual(self.list_ids(self.alice), {str(self.conversation.pk)})
+        
+        response = self.call(
+            {'post': 'create'}, 'post', '/api/conversations/', self.alice,
+            {'participant_ids': [str(self.carol.user_id)]}
+        )
+        created_id = response.data['conversation_id']
+        self.assertEqual(
+            self.list_ids(self.alice), {str(self.conversation.pk), str(hidden.pk), str(created_id)}
+        )
+        
+        version_key = f'conv_list_version:{self.bob.pk}'
+        self.list_ids(self.bob)
+        version = cache.get(version_key)
+        self.call(
+            {'patch': 'partial_update'}, 'patch', f'/api/conversations/{self.conversation.pk}/',
+            self.bob, {}, pk=self.conversation.pk
+        )
+        self.assertEqual(cache.get(version_key), version + 1)
+        
+        response = self.call(
+            {'delete': 'destroy'}, 'delete', f'/api/conversations/{self.conversation.pk}/',
+            self.bob, pk=self.conversation.pk
+        )
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(cache.get(version_key), version + 2)
+        self.assertEqual(self.list_ids(self.bob), set())
+    
+    def test_summary_returns_flat_rows(self):
+        """Test the summary lists the requester's conversations with their participant counts"""
+        other = Conversation.objects.create()
+        other.participants.add(self.bob, self.carol)
+        
+        response = self.call({'get': 'summary'}, 'get', '/api/conversations/summary/', self.alice)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(row['conversation_id'], row['participants_count']) for row in response.data['results']],
+            [(self.conversation.pk, 2)]
+        )
+    
+    def test_retrieve_answers_unchanged_polls_with_304(self):
+        """Test If-None-Match gets 304 until a message, the participants or a participant changes"""
+        path = f'/api/conversations/{self.conversation.pk}/'
+        
+        def poll(etag=None, user=None):
+            request = self.factory.get(path, HTTP_IF_NONE_MATCH=etag) if etag else self.factory.get(path)
+            force_authenticate(request, user=user or self.alice)
+            return ConversationViewSet.as_view({'get': 'retrieve'})(request, pk=self.conversation.pk)
+        
+        response = poll()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+        self.assertEqual(poll(etag).status_code, status.HTTP_304_NOT_MODIFIED)
+        # The permission check runs before the ETag comparison
+        self.assertEqual(poll(etag, user=self.carol).status_code, status.HTTP_403_FORBIDDEN)
+        
+        changes = [
+            lambda: Message.objects.create(
+                conversation=self.conversation, sender=self.alice, message_body='Hello'
+            ),
+            lambda: Message.objects.bulk_create([
+                Message(conversation=self.conversation, sender=self.bob, message_body='Hi')
+            ]),
+            lambda: Message.objects.filter(sender=self.bob).delete(),
+            lambda: Message.objects.get(sender=self.alice).save(),
+            lambda: self.conversation.participants.add(self.carol),
+            lambda: self.carol.conversations.remove(self.conversation),
+            lambda: User.objects.filter(pk=self.bob.pk).first().save(),
+        ]
+        for change in changes:
+            change()
+            response = poll(etag)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotEqual(response['ETag'], etag)
+            etag = response['ETag']
+            self.assertEqual(poll(etag).status_code, status.HTTP_304_NOT_MODIFIED)
+
+    
+    def test_retrieve_etag_depends_on_the_rendered_format(self):
+        """Test the ETag varies by Accept so JSON and browsable API bodies never validate each other"""
+        path = f'/api/conversations/{self.conversation.pk}/'
+        
+        def poll(accept, etag=None):
+            headers = {'HTTP_ACCEPT': accept}
+            if etag:
+                headers['HTTP_IF_NONE_MATCH'] = etag
+            request = self.factory.get(path, **headers)
+            force_authenticate(request, user=self.alice)
+            return ConversationViewSet.as_view({'get': 'retrieve'})(request, pk=self.conversation.pk)
+        
+        response = poll('application/json')
+        self.assertIn('Accept', response['Vary'])
+        json_etag = response['ETag']
+        not_modified = poll('application/json', json_etag)
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertIn('Accept', not_modified['Vary'])
+        
+        response = poll('text/html', json_etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], json_etag)
+
+
+class MessageViewSetTest(TestCase):
+    """Test cases for the message endpoints, called through the viewset"""
+    
+    def setUp(self):
+        """Set up a conversation with one message an hour before a boundary and one on it"""
+        cache.clear()
+        self.factory = APIRequestFactory()
+        self.alice = User.objects.create_user(
+            email='alice@example.com', password='testpass123', first_name='Alice', last_name='A'
+        )
+        self.conversation = Conversation.objects.create()
+        self.conversation.participants.add(self.alice)
+        self.boundary = timezone.now().replace(microsecond=0)
+        self.earlier = Message.objects.create(
+            conversation=self.conversation, sender=self.alice, message_body='Earlier',
+            sent_at=self.boundary - timezone.timedelta(hours=1)
+        )
+        self.on_boundary = Message.objects.create(
+            conversation=self.conversation, sender=self.alice, message_body='On the boundary',
+            sent_at=self.boundary
+        )
+    
+    def list_bodies(self, **params):
+        params['conversation_id'] = str(self.conversation.pk)
+        request = self.factory.get(f'/api/conversations/{self.conversation.pk}/messages/', params)
+        force_authenticate(request, user=self.alice)
+        response = MessageViewSet.as_view({'get': 'list'})(request, conversation_pk=self.conversation.pk)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return {row['message_body'] for row in response.data['results']}
+    
+    def test_sent_range_is_half_open(self):
+        """Test sent_before excludes a message sent exactly at it and sent_after includes it"""
+        boundary = self.boundary.isoformat()
+        self.assertEqual(self.list_bodies(sent_before=boundary), {'Earlier'})
+        self.assertEqual(self.list_bodies(sent_after=boundary), {'On the boundary'})
+        self.assertEqual(self.list_bodies(), {'Earlier', 'On the boundary'})
@@ -3,27 +3,139 @@ from rest_framework import viewsets, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.generics import get_object_or_404
+from django.core.cache import cache
+from django.db.models import Count, Max, Prefetch
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import quote_etag
 from django.views.decorators.cache import cache_page
 from django.utils.decorators import method_decorator
+from django_filters.rest_framework import DjangoFilterBackend
 from .models import User, Conversation, Message
-from .serializers import UserSerializer, ConversationSerializer, MessageSerializer
+from .serializers import UserSerializer, ConversationSerializer, ConversationListSerializer, MessageSerializer
 from .permissions import IsParticipantOfConversation
-from .pagination import MessagePagination
-from .filters import MessageFilter
+from .pagination import ConversationPagination, MessageCursorPagination
+from .filters import CachedSearchFilter, MessageFilter
+
+# Seconds a user's rendered conversation list is cached
+CONVERSATION_LIST_CACHE_TIMEOUT = 60
+
+
+def _conversation_list_version_key(user_id):
+    return f'conv_list_version:{user_id}'
+
+
+def invalidate_conversation_lists(user_ids):
+    """Bump each user's list version so their cached conversation pages are skipped."""
+    for user_id in user_ids:
+        try:
+            cache.incr(_conversation_list_version_key(user_id))
+        except ValueError:
+            # No version yet, so nothing is cached for this user
+            pass
 
 class ConversationViewSet(viewsets.ModelViewSet):
     queryset = Conversation.objects.all()
     serializer_class = ConversationSerializer
     permission_classes = [IsAuthenticated, IsParticipantOfConversation]
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
-    search_fields = ['participants__email']
+    filter_backends = [CachedSearchFilter, filters.OrderingFilter]
+    # Exact case-insensitive (iexact) email match instead of a '%term%'
+    # icontains scan. iexact compiles to UPPER(email) = UPPER(%s) on
+    # PostgreSQL and LIKE on SQLite, so the plain unique email index does not
+    # serve it; that would need an Upper('email') index or a nocase collation
+    search_fields = ['=participants__email']
     ordering_fields = ['created_at']
+    ordering = ['-created_at']
+    pagination_class = ConversationPagination
+
+    def get_queryset(self):
+        # Counted in the same query; annotate before the participant filter
+        # below so the count is not limited to the filtered join
+        queryset = super().get_queryset().annotate(participants_count=Count('participants'))
+        if self.action == 'summary':
+            return queryset.filter(participants=self.request.user)
+        if self.action == 'list':
+            # Only the requester's conversations; the list serializer only needs
+            # the conversation columns and participants
+            return queryset.filter(participants=self.request.user).only(
+                'conversation_id', 'created_at'
+            ).prefetch_related('participants')
+        # Load the nested participants and messages (with their senders) in a
+        # fixed number of queries instead of several per conversation
+        return queryset.prefetch_related(
+            'participants',
+            Prefetch('messages', queryset=Message.objects.select_related('sender').order_by('-sent_at')),
+        )
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return ConversationListSerializer
+        return super().get_serializer_class()
+
+    def list(self, request, *args, **kwargs):
+        # Cached per user and query string; writes bump the user's version, so
+        # stale pages are never read again and simply expire
+        version = cache.get_or_set(_conversation_list_version_key(request.user.pk), 1, None)
+        cache_key = f'conv_list:{request.user.pk}:{version}:{request.get_full_path()}'
+        data = cache.get(cache_key)
+        if data is None:
+            data = super().list(request, *args, **kwargs).data
+            cache.set(cache_key, data, CONVERSATION_LIST_CACHE_TIMEOUT)
+        return Response(data)
+
+    def retrieve(self, request, *args, **kwargs):
+        # Answer unchanged polls with 304 after a PK read and the permission
+        # check, before the prefetch and serializer run. The message count and
+        # newest sent_at catch bulk inserts and queryset or cascade deletes,
+        # which never go through Message.save() to bump updated_at
+        conversation = get_object_or_404(
+            Conversation.objects.only('conversation_id', 'updated_at').annotate(
+                message_count=Count('messages'), last_sent_at=Max('messages__sent_at')
+            ),
+            pk=kwargs[self.lookup_url_kwarg or self.lookup_field],
+        )
+        self.check_object_permissions(request, conversation)
+        last_sent_at = conversation.last_sent_at.isoformat() if conversation.last_sent_at else ''
+        # The negotiated format is part of the ETag: JSON and browsable API
+        # bodies of the same conversation must not validate each other
+        etag = quote_etag(
+            f'{request.accepted_renderer.format}:{conversation.updated_at.isoformat()}:'
+            f'{conversation.message_count}:{last_sent_at}'
+        )
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = super().retrieve(request, *args, **kwargs)
+        response['ETag'] = etag
+        patch_vary_headers(response, ['Accept'])
+        return response
 
     def perform_create(self, serializer):
+        # The serializer adds request.user alongside the other participants
         conversation = serializer.save()
-        conversation.participants.add(self.request.user)
+        invalidate_conversation_lists(conversation.participants.values_list('user_id', flat=True))
         return conversation
 
+    def perform_update(self, serializer):
+        conversation = serializer.save()
+        invalidate_conversation_lists(conversation.participants.values_list('user_id', flat=True))
+
+    def perform_destroy(self, instance):
+        participant_ids = list(instance.participants.values_list('user_id', flat=True))
+        instance.delete()
+        invalidate_conversation_lists(participant_ids)
+
+    @action(detail=False, methods=['get'])
+    def summary(self, request):
+        # Flat rows straight from values(): no Conversation or User instances
+        # and no nested serializers, for clients that only need the counts
+        queryset = self.filter_queryset(self.get_queryset()).values(
+            'conversation_id', 'created_at', 'participants_count'
+        )
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(list(page))
+        return Response(list(queryset))
+
     @action(detail=True, methods=['post'])
     def add_message(self, request, pk=None):
         conversation = self.get_object()
@@ -38,14 +150,16 @@ class MessageViewSet(viewsets.ModelViewSet):
     queryset = Message.objects.all()
     serializer_class = MessageSerializer
     permission_classes = [IsAuthenticated, IsParticipantOfConversation]
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    # DjangoFilterBackend applies filterset_class; without it MessageFilter is ignored
+    filter_backends = [DjangoFilterBackend, CachedSearchFilter, filters.OrderingFilter]
     search_fields = ['message_body']
     ordering_fields = ['sent_at']
-    pagination_class = MessagePagination
+    pagination_class = MessageCursorPagination
     filterset_class = MessageFilter
 
     def get_queryset(self):
-        queryset = super().get_queryset()
+        # sender_email is rendered for every message
+        queryset = super().get_queryset().select_related('sender')
         conversation_id = self.request.query_params.get('conversation_id')
         if conversation_id:
             queryset = queryset.filter(conversation__conversation_id=conversation_id)
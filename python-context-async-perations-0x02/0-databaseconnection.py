@@ -11,7 +11,14 @@ class DatabaseConnection:
         return self.cursor
 
     def __exit__(self, exc_type, exc_val, exc_tb):
+        # Keep work done in the block only if it finished without an error
+        if exc_type is None:
+            self.conn.commit()
+        else:
+            self.conn.rollback()
+        self.cursor.close()
         self.conn.close()
+        return False
 
 if __name__ == "__main__":
     with DatabaseConnection("my_database.db") as cursor:
@@ -1,26 +1,43 @@
 import sqlite3
 import functools
+import threading
 from datetime import datetime
 
+_local = threading.local()
+
+def get_connection():
+    """Return this thread's users.db connection, opening it on first use."""
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect("users.db")
+        # Set once per connection instead of paying for it on every query
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        _local.conn = conn
+    return conn
+
 #### decorator to lof SQL queries
 
 def log_queries(func):
     """Decorator that logs the SQL query before executing it."""
     @functools.wraps(func)
-    def wrapper(query):
+    def wrapper(query, *args, **kwargs):
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         print(f"[{timestamp}] [LOG] Executing SQL Query: {query}")
-        return func(query)
+        return func(query, *args, **kwargs)
     return wrapper
 
 @log_queries
-def fetch_all_users(query):
-    conn = sqlite3.connect('users.db')
-    cursor = conn.cursor()
-    cursor.execute(query)
-    results = cursor.fetchall()
-    conn.close()
-    return results
+def fetch_all_users(query, batch_size=1000):
+    """Yield the query's rows, holding at most batch_size of them in memory."""
+    cursor = get_connection().cursor()
+    try:
+        cursor.execute(query)
+        while rows := cursor.fetchmany(batch_size):
+            yield from rows
+    finally:
+        # Runs when the generator is exhausted, closed or garbage collected
+        cursor.close()
 
 #### fetch users while logging the query
-users = fetch_all_users(query="SELECT * FROM users")
+users = list(fetch_all_users(query="SELECT * FROM users"))
@@ -1,30 +1,53 @@
 import time
 import sqlite3 
 import functools
+import threading
+from collections import OrderedDict
 
-query_cache = {}
+# Most recently used results, bounded so a long-running process can't grow it forever
+QUERY_CACHE_SIZE = 256
+query_cache = OrderedDict()
+_query_cache_lock = threading.Lock()
+
+_local = threading.local()
+
+def get_connection():
+    """Return this thread's users.db connection, opening it on first use."""
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect("users.db")
+        # Set once per connection instead of paying for it on every query
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        _local.conn = conn
+    return conn
 
 def with_db_connection(func):
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        conn = sqlite3.connect("users.db")
-        try:
-            return func(conn, *args, **kwargs)
-        finally:
-            conn.close()
+        # Reuse the thread's open connection rather than reconnecting per call
+        return func(get_connection(), *args, **kwargs)
     return wrapper
 
 def cache_query(func):
     @functools.wraps(func)
     def wrapper(conn, query):
-        if query in query_cache:
+        with _query_cache_lock:
+            result = query_cache.get(query)
+            if result is not None:
+                query_cache.move_to_end(query)
+        if result is not None:
             print("[CACHE HIT] Returning cached result")
-            return query_cache[query]
-        else:
-            print("[CACHE MISS] Querying DB")
-            result = func(conn, query)
-            query_cache[query] = result
             return result
+        print("[CACHE MISS] Querying DB")
+        # Stored as a tuple so callers can't mutate the cached rows
+        result = tuple(func(conn, query))
+        with _query_cache_lock:
+            query_cache[query] = result
+            query_cache.move_to_end(query)
+            if len(query_cache) > QUERY_CACHE_SIZE:
+                query_cache.popitem(last=False)
+        return result
     return wrapper
 
 @with_db_connection
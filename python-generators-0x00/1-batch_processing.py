@@ -3,10 +3,16 @@
 from seed import connect_to_prodev
 
 
-def stream_users_in_batches(batch_size):
+def stream_users_in_batches(batch_size, min_age=None):
     connection = connect_to_prodev()
     cursor = connection.cursor(dictionary=True)
-    cursor.execute("SELECT user_id, name, email, age FROM user_data")
+    if min_age is None:
+        cursor.execute("SELECT user_id, name, email, age FROM user_data")
+    else:
+        # Filter in MySQL so only matching rows cross the network
+        cursor.execute(
+            "SELECT user_id, name, email, age FROM user_data WHERE age > %s", (min_age,)
+        )
 
     while True:
         rows = cursor.fetchmany(batch_size)
@@ -19,7 +25,6 @@ def stream_users_in_batches(batch_size):
 
 
 def batch_processing(batch_size):
-    for batch in stream_users_in_batches(batch_size):
+    for batch in stream_users_in_batches(batch_size, min_age=25):
         for user in batch:
-            if user['age'] > 25:
-                yield user
\ No newline at end of file
+            yield user
@@ -1,5 +1,6 @@
 import mysql.connector
 import csv
+from itertools import islice
 
 def connect_db():
     return mysql.connector.connect(
@@ -24,22 +25,28 @@ def create_table(connection):
         user_id VARCHAR(36) PRIMARY KEY,
         name VARCHAR(255) NOT NULL,
         email VARCHAR(255) NOT NULL,
-        age DECIMAL NOT NULL
+        age DECIMAL NOT NULL,
+        INDEX idx_user_data_age (age)
     )""")
     connection.commit()
     cursor.close()
 
-def insert_data(connection, data_file):
+def insert_data(connection, data_file, batch_size=10000):
     cursor = connection.cursor()
     with open(data_file, "r") as f:
         reader = csv.reader(f)
         next(reader)
-        for row in reader:
-            cursor.execute("SELECT user_id FROM user_data WHERE user_id=%s", (row[0],))
-            if not cursor.fetchone():
-                cursor.execute(
-                    "INSERT INTO user_data (user_id, name, email, age) VALUES (%s, %s, %s, %s)",
-                    (row[0], row[1], row[2], row[3])
-                )
+        while True:
+            batch = [(row[0], row[1], row[2], row[3]) for row in islice(reader, batch_size)]
+            if not batch:
+                break
+            # executemany sends the batch as one multi-row INSERT; the primary
+            # key turns existing user_ids into no-op updates, so no lookup
+            # query is needed and other data errors still raise
+            cursor.executemany(
+                "INSERT INTO user_data (user_id, name, email, age) VALUES (%s, %s, %s, %s) "
+                "ON DUPLICATE KEY UPDATE user_id = user_id",
+                batch
+            )
     connection.commit()
     cursor.close()